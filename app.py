@@ -1,8 +1,14 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import os
-from io import BytesIO
+from functools import partial
+
+from ticket_backends import BACKENDS
+from ticket_charts import FIGURE_BUILDERS, bucket_trend, table_fingerprint
+from ticket_export import EXPORT_FORMATS
+from ticket_io import load_tickets, source_fingerprint
+from ticket_query import created_bounds, filter_key, filter_options, page_rows, sort_order, take_rows
+from ticket_store import has_history, history_bounds, history_fingerprint, ingest_workbooks, read_history
 
 st.set_page_config(page_title="TCPL Ticket Dashboard", layout="wide")
 st.title("📊 TCPL Ticket Management Dashboard")
@@ -16,51 +22,99 @@ DEFAULT_DATAFILE = "data.xlsx"
 if uploaded_file is None and os.path.exists(DEFAULT_DATAFILE):
     uploaded_file = DEFAULT_DATAFILE
 
+# --- Weekly history ------------------------------------------------------
+# Weekly exports can be merged into a persistent local history (parsed in
+# parallel, upserted by Ticket Id) so months of tickets can be analyzed
+# without re-uploading them.
+with st.expander("Ticket history"):
+    weekly_files = st.file_uploader("Add weekly exports to the history (.xlsx)", type=["xlsx"], accept_multiple_files=True)
+    if weekly_files and st.button("Add to history"):
+        try:
+            with st.spinner("Merging weekly exports..."):
+                inserted, updated = ingest_workbooks([(f.name, f.getvalue()) for f in weekly_files])
+            st.success(f"Added {inserted} new and {updated} changed tickets to the history.")
+        except Exception as e:
+            st.error(f"Failed to add the exports to the history: {e}")
+    use_history = st.checkbox("Analyze the stored ticket history", disabled=not has_history())
+
 # If still no file, show friendly message and stop
-if not uploaded_file:
+if not uploaded_file and not use_history:
     st.warning(
-        "No data file found. Please either:
-
-"
-        "• Upload the Excel file using the 'Upload Excel File' control, or
-"
-        "• Add a file named 'data.xlsx' into the repository so the app can use it by default."
+        "No data file found. Please either:\n\n"
+        "• Upload the Excel file using the 'Upload Excel File' control, or\n"
+        "• Add a file named 'data.xlsx' into the repository so the app can use it by default, or\n"
+        "• Add weekly exports under 'Ticket history' and analyze the stored history."
     )
     st.stop()
 
 # --- Read the spreadsheet -------------------------------------------------
+# Streamlit reruns this script on every widget interaction, so the parsed and
+# typed frame is cached under the source fingerprint (content hash for uploads,
+# mtime/size for the default file). The cached frame is shared between reruns
+# and must be treated as read-only. Behind the in-memory cache, load_tickets
+# keeps a Parquet sidecar per workbook so restarts skip the openpyxl parse.
+DATASET_CACHE_ENTRIES = 8
+
+@st.cache_resource(max_entries=DATASET_CACHE_ENTRIES, show_spinner="Reading workbook...")
+def load_dataset(fingerprint, _source):
+    return load_tickets(_source, fingerprint)
+
+@st.cache_resource(max_entries=DATASET_CACHE_ENTRIES, show_spinner="Reading ticket history...")
+def load_history_dataset(fingerprint, _start_date, _end_date):
+    # the fingerprint already names the months read; the exact dates are not part of the key
+    return read_history(start_date=_start_date, end_date=_end_date)
+
+# Query engine behind the filters, KPIs and chart group-bys, built once per
+# dataset: in-process (row bitmaps plus a pre-aggregated Priority x
+# TicketType x Resolution Status x day cube), an embedded database file that
+# the filters are pushed down to as SQL, or a Polars lazy query per view.
+@st.cache_resource(max_entries=DATASET_CACHE_ENTRIES, show_spinner="Preparing query engine...")
+def load_backend(engine, fingerprint, _df):
+    return BACKENDS[engine](_df, fingerprint)
+
+# The stored history is partitioned by Created Time month and only the months
+# overlapping the selected window are read, so its date bounds come from the
+# history index and the date range is chosen before any tickets are loaded.
+# The history view opens on its most recent week.
+HISTORY_DEFAULT_DAYS = 7
+
+df = None
 try:
-    df = pd.read_excel(uploaded_file)
+    if use_history:
+        first_created, last_created = history_bounds()
+    else:
+        dataset_key = source_fingerprint(uploaded_file)
+        df = load_dataset(dataset_key, uploaded_file)
+        first_created, last_created = created_bounds(df['Created Time']) if 'Created Time' in df.columns else (None, None)
 except Exception as e:
     st.error(f"Failed to read uploaded file: {e}")
     st.stop()
 
-# Normalize / parse dates safely
-if 'Created Time' in df.columns:
-    df['Created Time'] = pd.to_datetime(df['Created Time'], errors='coerce')
-if 'Closed Time' in df.columns:
-    df['Closed Time'] = pd.to_datetime(df['Closed Time'], errors='coerce')
+if df is not None:
+    for col, count in df.attrs.get('coerced_dates', {}).items():
+        if count:
+            st.warning(f"{count} '{col}' value(s) could not be read as dates and were left blank.")
 
 # --- Sidebar filters -----------------------------------------------------
 st.sidebar.header("Filters")
-priority_filter = st.sidebar.multiselect("Select Priority", options=df.get('Priority', pd.Series()).dropna().unique())
-ticket_type_filter = st.sidebar.multiselect("Select Ticket Type", options=df.get('TicketType', pd.Series()).dropna().unique())
-sla_filter = st.sidebar.multiselect("SLA Status", options=df.get('Resolution Status', pd.Series()).dropna().unique())
 
 # --- Robust date-range input ---------------------------------------------
 start_date = None
 end_date = None
-if 'Created Time' in df.columns:
-    min_date = df['Created Time'].min().date()
-    max_date = df['Created Time'].max().date()
+if first_created is not None:
+    min_date = first_created.date()
+    max_date = last_created.date()
+    default_start = min_date
+    if use_history:
+        default_start = max(min_date, max_date - pd.Timedelta(days=HISTORY_DEFAULT_DAYS - 1))
     # Provide a date_input that returns either a single date or a list of two dates
-    date_input_value = st.sidebar.date_input("Choose a date range", [min_date, max_date])
+    date_input_value = st.sidebar.date_input("Choose a date range", [default_start, max_date])
 
     # Normalize date_input_value to start_date and end_date
     if isinstance(date_input_value, (list, tuple)):
         if len(date_input_value) == 2:
             start_date, end_date = date_input_value
-n        elif len(date_input_value) == 1:
+        elif len(date_input_value) == 1:
             # single selection returned as list with one element
             start_date = end_date = date_input_value[0]
     else:
@@ -73,68 +127,134 @@ if start_date is not None:
 if end_date is not None:
     end_date = pd.to_datetime(end_date)
 
-# --- Apply filters and produce filtered_df --------------------------------
-filtered_df = df.copy()
-if priority_filter:
-    filtered_df = filtered_df[filtered_df['Priority'].isin(priority_filter)]
-if ticket_type_filter:
-    filtered_df = filtered_df[filtered_df['TicketType'].isin(ticket_type_filter)]
-if sla_filter:
-    filtered_df = filtered_df[filtered_df['Resolution Status'].isin(sla_filter)]
-
-if start_date is not None and 'Created Time' in filtered_df.columns:
-    if end_date is None:
-        end_date = start_date
-    # include full day for end_date
-    filtered_df = filtered_df[(filtered_df['Created Time'] >= start_date) & (filtered_df['Created Time'] <= end_date)]
+if use_history:
+    # one cached dataset per range of months read
+    months = (None, None) if start_date is None else (f"{start_date:%Y-%m}", f"{(end_date or start_date):%Y-%m}")
+    dataset_key = f"{history_fingerprint()}:{months[0]}:{months[1]}"
+    try:
+        df = load_history_dataset(dataset_key, start_date, end_date)
+    except Exception as e:
+        st.error(f"Failed to read the ticket history: {e}")
+        st.stop()
+    if df is None:
+        st.info("No stored tickets fall in the selected date range.")
+        st.stop()
+
+priority_filter = st.sidebar.multiselect("Select Priority", options=filter_options(df, 'Priority'))
+ticket_type_filter = st.sidebar.multiselect("Select Ticket Type", options=filter_options(df, 'TicketType'))
+sla_filter = st.sidebar.multiselect("SLA Status", options=filter_options(df, 'Resolution Status'))
+engine = st.sidebar.selectbox("Query engine", list(BACKENDS))
+
+# --- Apply filters ---------------------------------------------------------
+# Users flip between a handful of filter combinations, so each filtered view is
+# cached together with its KPIs and chart aggregates under the dataset
+# fingerprint plus a normalized filter tuple; older views are evicted LRU.
+# A view is cached as its row positions in the dataset (a slice, or 8 bytes
+# per row), never as a frame: only the visible page and, on download, the
+# export are gathered from the dataset.
+FILTER_CACHE_ENTRIES = 32
+
+@st.cache_resource(max_entries=FILTER_CACHE_ENTRIES)
+def load_view(engine, fingerprint, view_key, _df):
+    # KPIs and chart aggregates come from the engine's own aggregation (the
+    # cube, or GROUP BY queries) rather than from the filtered rows.
+    backend = load_backend(engine, fingerprint, _df)
+    rows = backend.positions(view_key)
+    summary = backend.summarize(view_key)
+    # hourly trend buckets read the view's Created Time column only
+    created = take_rows(_df[['Created Time']], rows) if 'Created Time' in _df.columns else None
+    summary['trend'], summary['trend_bucket'] = bucket_trend(summary['trend'], created, *view_key[3:])
+    return rows, summary
+
+view_key = filter_key(priority_filter, ticket_type_filter, sla_filter, start_date, end_date)
+view_rows, summary = load_view(engine, dataset_key, view_key, df)
+view_size = summary['kpis'].total_tickets
 
 # --- KPIs ----------------------------------------------------------------
-total_tickets = len(filtered_df)
-within_sla = 0
-if 'Resolution Status' in filtered_df.columns:
-    within_sla = filtered_df['Resolution Status'].str.contains('Within', case=False, na=False).sum()
-sla_percentage = (within_sla / total_tickets * 100) if total_tickets > 0 else 0
+kpis = summary['kpis']
 
 col1, col2, col3, col4 = st.columns([1.5,1,1,1])
-col1.metric("Total Tickets", total_tickets)
-col2.metric("Within SLA", f"{sla_percentage:.1f}%")
-col3.metric("Avg Resolution (hrs)", round(((filtered_df['Closed Time'] - filtered_df['Created Time']).dt.total_seconds()/3600).mean(),2) if ('Closed Time' in filtered_df.columns and 'Created Time' in filtered_df.columns and not filtered_df.empty) else '—')
-col4.metric("P4 Tickets", int(filtered_df[filtered_df.get('Priority') == 'P4'].shape[0]) if 'Priority' in filtered_df.columns else 0)
+col1.metric("Total Tickets", kpis.total_tickets)
+col2.metric("Within SLA", f"{kpis.sla_percentage:.1f}%")
+col3.metric("Avg Resolution (hrs)", kpis.avg_resolution_hours if kpis.avg_resolution_hours is not None else '—')
+col4.metric("P4 Tickets", kpis.p4_tickets)
 
 st.markdown("---")
 
 # --- Charts ---------------------------------------------------------------
-if 'Priority' in filtered_df.columns and not filtered_df.empty:
-    prio_counts = filtered_df['Priority'].value_counts().reset_index()
+# Figures are cached under a fingerprint of their aggregate table and title,
+# so reruns that do not change a chart's input skip plotly.express entirely.
+FIGURE_CACHE_ENTRIES = 32
+
+@st.cache_resource(max_entries=FIGURE_CACHE_ENTRIES)
+def load_figure(kind, table_key, title, _table):
+    return FIGURE_BUILDERS[kind](_table, title)
+
+def show_figure(kind, table, title):
+    fig = load_figure(kind, table_fingerprint(table), title, table)
+    st.plotly_chart(fig, use_container_width=True)
+
+if summary['priority_counts'] is not None:
+    prio_counts = summary['priority_counts'].reset_index()
     prio_counts.columns = ['Priority','Count']
-    fig_prio = px.bar(prio_counts, x='Priority', y='Count', title='Tickets by Priority', text='Count')
-    st.plotly_chart(fig_prio, use_container_width=True)
+    show_figure('priority', prio_counts, 'Tickets by Priority')
 
-if 'TicketType' in filtered_df.columns and not filtered_df.empty:
-    fig_type = px.pie(filtered_df, names='TicketType', title='Ticket Type Distribution')
-    st.plotly_chart(fig_type, use_container_width=True)
+# the pie gets one row per ticket type rather than one per ticket, so the
+# figure payload does not grow with the number of tickets
+if summary['type_counts'] is not None:
+    type_counts = summary['type_counts'].reset_index()
+    type_counts.columns = ['TicketType','Count']
+    show_figure('type', type_counts, 'Ticket Type Distribution')
 
-if 'Created Time' in filtered_df.columns and not filtered_df.empty:
-    trend = filtered_df.groupby(filtered_df['Created Time'].dt.date).size().reset_index(name='Count')
-    trend.columns = ['Date','Count']
-    fig_trend = px.line(trend, x='Date', y='Count', title='Tickets Over Time', markers=True)
-    st.plotly_chart(fig_trend, use_container_width=True)
+# bucketed by hour/day/week/month depending on the window, and capped in size
+if summary['trend'] is not None:
+    trend = summary['trend'].reset_index(name='Count')
+    trend.columns = [summary['trend_bucket'],'Count']
+    show_figure('trend', trend, 'Tickets Over Time')
 
 st.markdown("---")
 
 # --- Data table ----------------------------------------------------------
+# Only the visible page is sent to the browser. The sort order is computed
+# once per view and sort column and cached; sorting on Created Time reuses the
+# order the dataset is already stored in.
+PAGE_SIZES = (50, 100, 250, 500)
+
+@st.cache_resource(max_entries=FILTER_CACHE_ENTRIES)
+def load_sort_order(fingerprint, view_key, column, ascending, _df, _rows):
+    # only the sort column of the view is gathered
+    return sort_order(take_rows(_df[[column]], _rows), column, ascending)
+
 st.subheader("Filtered Tickets")
-st.dataframe(filtered_df.sort_values(by='Created Time', ascending=False).reset_index(drop=True), height=420)
-
-# --- Excel download (BytesIO) --------------------------------------------
-def to_excel_bytes(df_to_export):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df_to_export.to_excel(writer, index=False, sheet_name='Filtered')
-    return output.getvalue()
-
-if not filtered_df.empty:
-    excel_bytes = to_excel_bytes(filtered_df)
-    st.download_button(label='Download filtered data as Excel', data=excel_bytes, file_name='filtered_tickets.xlsx', mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+sort_col, direction_col, size_col, page_col = st.columns(4)
+sortable = list(df.columns)
+sort_by = sort_col.selectbox("Sort by", sortable, index=sortable.index('Created Time') if 'Created Time' in sortable else 0)
+sort_direction = direction_col.selectbox("Order", ["Descending", "Ascending"])
+page_size = size_col.selectbox("Rows per page", PAGE_SIZES, index=1)
+page_count = max(1, -(-view_size // page_size))
+page = page_col.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+
+order = load_sort_order(dataset_key, view_key, sort_by, sort_direction == "Ascending", df, view_rows)
+table_page = page_rows(df, order, int(page), page_size, view_rows)
+st.dataframe(table_page, height=420)
+if view_size:
+    st.caption(f"Rows {table_page.index.start + 1}–{table_page.index.stop} of {view_size} (page {int(page)} of {page_count})")
+
+# --- Download ------------------------------------------------------------
+# Exports are only written when the button is clicked (download_button runs the
+# callable on demand) and are cached per dataset, filter state and format.
+# Streamlit serves downloads from bytes (it reads file-like data into bytes
+# itself), so the bytes are cached as a shared resource: cache_data would
+# pickle them on store and copy them again on every hit.
+EXPORT_CACHE_ENTRIES = 8
+
+@st.cache_resource(max_entries=EXPORT_CACHE_ENTRIES, show_spinner=False)
+def load_export(fingerprint, view_key, export_format, _df, _rows):
+    return EXPORT_FORMATS[export_format].write(take_rows(_df, _rows))
+
+if view_size:
+    export_format = st.selectbox("Export format", list(EXPORT_FORMATS))
+    export = EXPORT_FORMATS[export_format]
+    st.download_button(label=f'Download filtered data as {export.name}', data=partial(load_export, dataset_key, view_key, export_format, df, view_rows), file_name=export.file_name, mime=export.mime)
 
 st.caption("Built with Streamlit — Upload your Excel file to refresh the dashboard. For persistent uploads, consider saving files to a secure storage (S3/GitHub) or implementing authenticated upload." )
@@ -0,0 +1,105 @@
+"""Benchmark the dashboard's query engines on synthetic ticket sets.
+
+    python bench_backends.py --rows 100000 1000000 --repeat 5
+
+For every size the engines in ticket_backends.BACKENDS are built once and then
+answer the same filter keys (summary plus filtered rows), next to the
+row-based pandas pipeline (filter, then ticket_query.summarize). Every engine's
+KPIs and chart aggregates are checked against the pandas engine before timing,
+and its query time is reported relative to that engine, the app's default: a
+ratio below 1.0x means the engine is slower than the cube-backed pandas one.
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from ticket_backends import BACKENDS, SqlBackend
+from ticket_query import FilterIndex, apply_filters, filter_key, summarize
+from ticket_samples import TICKET_TYPES, synthetic_tickets
+
+# the app's engine selectbox preselects the first engine
+DEFAULT_BACKEND = next(iter(BACKENDS))
+
+
+def filter_keys():
+    """A mix of the filter combinations the dashboard sees."""
+    start, end = pd.Timestamp('2025-03-01'), pd.Timestamp('2025-05-31')
+    return [
+        filter_key([], [], [], None, None),
+        filter_key([], [], [], start, end),
+        filter_key(['P4'], [], [], None, None),
+        filter_key(['P1', 'P2'], TICKET_TYPES[:2], [], start, end),
+        filter_key([], [], ['Within SLA'], pd.Timestamp('2025-07-01'), pd.Timestamp('2025-07-07')),
+    ]
+
+
+def _same_summary(expected, actual):
+    if expected['kpis'] != actual['kpis']:
+        return False
+    for part in ('priority_counts', 'type_counts', 'trend'):
+        x, y = expected[part], actual[part]
+        if (x is None) != (y is None):
+            return False
+        if x is not None and (list(x.index) != list(y.index) or not np.array_equal(x.to_numpy(), y.to_numpy())):
+            return False
+    return True
+
+
+def _time(run, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench(n, repeat, cache_dir):
+    df = synthetic_tickets(n)
+    keys = filter_keys()
+    results = []
+
+    index = FilterIndex(df)
+    rows_time = _time(lambda: [summarize(apply_filters(df, index, key)) for key in keys], repeat)
+    results.append(('pandas rows', None, rows_time))
+
+    expected = None
+    for name, backend_class in BACKENDS.items():
+        started = time.perf_counter()
+        # keep the benchmark's database files out of the app's cache dir
+        options = {'cache_dir': cache_dir} if backend_class is SqlBackend else {}
+        backend = backend_class(df, f"bench:{n}", **options)
+        build = time.perf_counter() - started
+        summaries = [backend.summarize(key) for key in keys]
+        if expected is None:
+            expected = summaries
+        elif not all(_same_summary(x, y) for x, y in zip(expected, summaries)):
+            raise AssertionError(f"{name} results differ from the pandas engine at {n} rows")
+        query = _time(lambda: [(backend.summarize(key), backend.rows(key)) for key in keys], repeat)
+        results.append((name, build, query))
+
+    # the default engine is the baseline every other engine has to beat
+    baseline = dict((name, query) for name, _, query in results)[DEFAULT_BACKEND]
+    print(f"\n{n:,} tickets, {len(keys)} filter keys (best of {repeat})")
+    print(f"{'engine':<16}{'build s':>10}{'queries s':>12}{'vs ' + DEFAULT_BACKEND:>12}")
+    for name, build, query in results:
+        build_text = '-' if build is None else f"{build:.3f}"
+        verdict = '' if name == DEFAULT_BACKEND else ('  faster' if query < baseline else '  slower')
+        print(f"{name:<16}{build_text:>10}{query:>12.4f}{baseline / query:>11.2f}x{verdict}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for n in args.rows:
+            bench(n, args.repeat, cache_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import os
+import sys
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+# the dashboard modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ticket_io import DATE_COLUMNS, TICKET_COLUMNS, add_resolution_hours, finalize_tickets  # noqa: E402
+
+
+def ticket_frame(created, **columns):
+    """Typed ticket frame, as load_tickets returns it, with one ticket per ``created`` value.
+
+    Ticket Ids count from 1 and every other column defaults to a value derived
+    from the Ticket Id, so a ticket looks the same in every frame it is part
+    of: Closed Time is five hours after creation, Status follows it and the
+    categories cycle through a few labels (Priority includes blanks).
+    ``columns`` gives per-ticket values for any column instead.
+    """
+    ids = np.asarray(columns.pop('Ticket Id', np.arange(1, len(created) + 1)))
+    df = pd.DataFrame({'Ticket Id': ids, 'Created Time': pd.Series(created, dtype=object)})
+    for col in DATE_COLUMNS:
+        if col in columns:
+            df[col] = pd.Series(columns.pop(col), dtype=object)
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format='mixed').astype('datetime64[us]')
+    if 'Closed Time' not in df.columns:
+        df['Closed Time'] = df['Created Time'] + pd.Timedelta(hours=5)
+    defaults = {
+        'Priority': np.array(['P1', 'P4', 'P2', None], dtype=object)[ids % 4],
+        'Resolution Status': np.array(['Within SLA', 'SLA Violated'], dtype=object)[ids % 2],
+        'Status': np.where(df['Closed Time'].isna(), 'Open', 'Closed'),
+        'Subject': [f"Ticket {ticket_id}" for ticket_id in ids],
+        'TicketType': np.array(['Incident', 'Request', 'Change'], dtype=object)[ids % 3],
+    }
+    for col, values in {**defaults, **columns}.items():
+        df[col] = values
+    return finalize_tickets(add_resolution_hours(df))
+
+
+def workbook_file(frame, path, title_rows=()):
+    """Save the ticket columns of ``frame`` as an .xlsx export at ``path`` (blank cells for missing values).
+
+    ``title_rows`` are written above the header row, as report exports do.
+    """
+    workbook = openpyxl.Workbook()
+    for row in title_rows:
+        workbook.active.append(list(row))
+    columns = [col for col in TICKET_COLUMNS if col in frame.columns]
+    workbook.active.append(columns)
+    for row in frame[columns].astype(object).itertuples(index=False):
+        workbook.active.append([None if pd.isna(value) else value for value in row])
+    workbook.save(path)
+    return path
+
+
+@pytest.fixture
+def make_tickets():
+    return ticket_frame
+
+
+@pytest.fixture
+def write_workbook():
+    return workbook_file
@@ -0,0 +1,109 @@
+import datetime as dt
+import os
+
+import pandas as pd
+import pytest
+
+import ticket_backends
+from ticket_backends import PandasBackend, PolarsBackend, SqlBackend
+from ticket_io import read_tickets
+from ticket_query import filter_key
+from ticket_samples import TICKET_TYPES, synthetic_tickets
+
+ENGINES = ['pandas', 'duckdb', 'sqlite', 'polars']
+
+KEYS = [
+    filter_key([], [], [], None, None),
+    filter_key(['P4'], [], [], None, None),
+    filter_key(['P1', 'P3'], TICKET_TYPES[:1], [], None, None),
+    filter_key([], [], ['Within SLA'], dt.date(2025, 1, 3), dt.date(2025, 1, 9)),
+    filter_key(['P9'], [], [], None, None),
+]
+
+
+@pytest.fixture(params=ENGINES)
+def make_backend(request, tmp_path, monkeypatch):
+    engine = request.param
+    if engine == 'duckdb' and ticket_backends.duckdb is None:
+        pytest.skip('duckdb is not installed')
+    if engine == 'polars' and ticket_backends.pl is None:
+        pytest.skip('polars is not installed')
+    if engine == 'sqlite':
+        monkeypatch.setattr(ticket_backends, 'duckdb', None)
+
+    def make(df, fingerprint='tickets'):
+        if engine == 'pandas':
+            return PandasBackend(df)
+        if engine == 'polars':
+            return PolarsBackend(df)
+        return SqlBackend(df, fingerprint, cache_dir=str(tmp_path))
+    return make
+
+
+def tickets(n=300):
+    # three weeks of tickets, some undated and with blank categories
+    return synthetic_tickets(n, days=20, missing=0.05, undated=0.05)
+
+
+def assert_same(expected, actual):
+    assert expected['kpis'] == actual['kpis']
+    for part in ('priority_counts', 'type_counts', 'trend'):
+        if expected[part] is None:
+            assert actual[part] is None
+        else:
+            assert list(expected[part].index) == list(actual[part].index)
+            assert expected[part].tolist() == actual[part].tolist()
+
+
+def check_parity(df, backend):
+    reference = PandasBackend(df)
+    for key in KEYS:
+        assert_same(reference.summarize(key), backend.summarize(key))
+        pd.testing.assert_frame_equal(reference.rows(key), backend.rows(key))
+
+
+def test_matches_pandas_engine(make_backend):
+    df = tickets()
+    check_parity(df, make_backend(df))
+
+
+def test_header_only_workbook(make_backend, tmp_path, write_workbook):
+    df = read_tickets(write_workbook(tickets(0), tmp_path / 'empty.xlsx'))
+    assert df.empty
+    backend = make_backend(df, 'empty')
+    summary = backend.summarize(KEYS[0])
+    assert summary['kpis'].total_tickets == 0
+    assert summary['priority_counts'] is None and summary['trend'] is None
+    check_parity(df, backend)
+
+
+def test_all_null_category_column(make_backend):
+    df = tickets()
+    df['Resolution Status'] = pd.Series(None, index=df.index, dtype=object).astype(pd.CategoricalDtype([]))
+    backend = make_backend(df, 'blank-status')
+    assert backend.summarize(KEYS[0])['kpis'].within_sla == 0
+    check_parity(df, backend)
+
+
+@pytest.mark.parametrize('dialect', ['duckdb', 'sqlite'])
+def test_database_files_are_versioned_and_pruned(dialect, tmp_path, monkeypatch):
+    if dialect == 'duckdb' and ticket_backends.duckdb is None:
+        pytest.skip('duckdb is not installed')
+    if dialect == 'sqlite':
+        monkeypatch.setattr(ticket_backends, 'duckdb', None)
+    monkeypatch.setattr('ticket_io.SIDECAR_MAX_FILES', 2)
+    df = tickets(50)
+    first = SqlBackend(df, 'w1', cache_dir=str(tmp_path))
+    # same fingerprint, different schema: a separate database file
+    changed = SqlBackend(df.drop(columns=['Subject']), 'w1', cache_dir=str(tmp_path))
+    assert changed.path != first.path
+    SqlBackend(df, 'w2', cache_dir=str(tmp_path))
+    assert len(list(tmp_path.glob(f"*.{dialect}"))) == 2
+    assert not os.path.exists(first.path)
+    # a backend whose file was pruned keeps answering from its open connection
+    assert first.summarize(KEYS[0])['kpis'] == PandasBackend(df).summarize(KEYS[0])['kpis']
+
+
+def test_without_created_time(make_backend):
+    df = tickets().drop(columns=['Created Time'])
+    check_parity(df, make_backend(df, 'undated'))
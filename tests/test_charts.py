@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ticket_charts import bucket_trend, lttb, trend_bucket
+
+
+@pytest.mark.parametrize('start, end, label', [
+    ('2025-11-24', '2025-11-24', 'Hour'),
+    ('2025-11-24 23:00', '2025-11-25 01:00', 'Hour'),
+    ('2025-11-24', '2025-11-26', 'Day'),
+    ('2025-01-01', '2025-04-02', 'Day'),
+    ('2025-01-01', '2025-04-03', 'Week'),
+    ('2024-01-01', '2025-12-30', 'Week'),
+    ('2024-01-01', '2025-12-31', 'Month'),
+])
+def test_trend_bucket_by_window_width(start, end, label):
+    assert trend_bucket(start, end)[1] == label
+
+
+def test_lttb_keeps_short_series_whole():
+    assert lttb(np.arange(10), np.ones(10), 10).tolist() == list(range(10))
+    assert lttb(np.arange(10), np.ones(10), 2).tolist() == list(range(10))
+
+
+def test_lttb_picks_one_point_per_bucket_and_keeps_spikes():
+    n, threshold = 1_000, 50
+    x = np.arange(n)
+    y = np.zeros(n)
+    y[[123, 500, 877]] = [5, -8, 3]
+    keep = lttb(x, y, threshold)
+    assert len(keep) == threshold
+    assert keep[0] == 0 and keep[-1] == n - 1
+    assert np.all(np.diff(keep) > 0)
+    assert {123, 500, 877} <= set(keep.tolist())
+
+
+def test_bucket_trend_hourly_reads_the_view(make_tickets):
+    view = make_tickets(['2025-11-24 09:10:00', '2025-11-24 09:50:00', '2025-11-24 13:00:00', None])
+    daily = view.groupby(view['Created Time'].dt.normalize()).size()
+    trend, label = bucket_trend(daily, view, pd.Timestamp('2025-11-24'), pd.Timestamp('2025-11-24'))
+    assert label == 'Hour'
+    assert trend.to_dict() == {pd.Timestamp('2025-11-24 09:00'): 2, pd.Timestamp('2025-11-24 13:00'): 1}
+
+
+def test_bucket_trend_downsamples_long_series():
+    days = pd.date_range('2025-01-01', periods=90)
+    daily = pd.Series(np.arange(90) % 7, index=days)
+    trend, label = bucket_trend(daily, None, max_points=30)
+    assert label == 'Day' and len(trend) == 30
+    assert trend.index[0] == days[0] and trend.index[-1] == days[-1]
+    monthly, label = bucket_trend(daily, None, pd.Timestamp('2023-01-01'), pd.Timestamp('2025-03-31'))
+    assert label == 'Month' and monthly.sum() == daily.sum()
+    assert bucket_trend(None, None) == (None, None)
+    assert bucket_trend(daily.iloc[:0], None) == (None, None)
@@ -0,0 +1,96 @@
+import gzip
+from io import BytesIO
+
+import openpyxl
+import pandas as pd
+import pytest
+
+import ticket_export
+from ticket_export import (
+    EXCEL_DATETIME_FORMAT, to_csv_bytes, to_csv_gzip_bytes, to_excel_bytes, to_parquet_bytes, write_excel_stream,
+)
+from ticket_samples import synthetic_tickets
+
+
+def views():
+    df = synthetic_tickets(23, missing=0.2)
+    return {'tickets': df, 'empty': df.iloc[:0]}
+
+
+def as_read_back(df):
+    """``df`` as a plain-typed reader returns it: categories as text, float64 hours."""
+    return df.astype({col: object for col in df.select_dtypes('category').columns}).astype({'resolution_hours': 'float64'})
+
+
+def assert_round_trip(expected, actual):
+    pd.testing.assert_frame_equal(
+        as_read_back(expected).reset_index(drop=True), actual,
+        check_dtype=False, check_index_type=False, check_column_type=False, atol=1e-4,
+    )
+
+
+@pytest.mark.parametrize('view', ['tickets', 'empty'])
+@pytest.mark.parametrize('writer', ['xlsxwriter', 'openpyxl'])
+def test_excel_round_trip(view, writer, monkeypatch):
+    if writer == 'openpyxl':
+        monkeypatch.setattr(ticket_export, 'xlsxwriter', None)
+    elif ticket_export.xlsxwriter is None:
+        pytest.skip('xlsxwriter is not installed')
+    df = views()[view]
+    back = pd.read_excel(BytesIO(to_excel_bytes(df)), sheet_name='Filtered')
+    assert list(back.columns) == list(df.columns)
+    if len(df):
+        back = back.astype({col: 'datetime64[us]' for col in ('Created Time', 'Closed Time')})
+        assert_round_trip(df, back)
+    else:
+        assert back.empty
+
+
+def test_streamed_workbook_cells():
+    if ticket_export.xlsxwriter is None:
+        pytest.skip('xlsxwriter is not installed')
+    df = views()['tickets']
+    # chunks smaller than the view, so rows are written across several steps
+    with write_excel_stream(df, chunk_rows=5) as output:
+        assert output.tell() == 0
+        sheet = openpyxl.load_workbook(output)['Filtered']
+    rows = list(sheet.iter_rows(values_only=True))
+    assert list(rows[0]) == list(df.columns) and sheet['A1'].font.b
+    assert [row[0] for row in rows[1:]] == df['Ticket Id'].tolist()
+    created = sheet.cell(row=2, column=df.columns.get_loc('Created Time') + 1)
+    assert created.is_date and created.number_format == EXCEL_DATETIME_FORMAT
+    assert created.value == df['Created Time'].iloc[0]
+    hours = sheet.cell(row=2, column=df.columns.get_loc('resolution_hours') + 1)
+    assert hours.number_format == ticket_export.EXCEL_FLOAT_FORMAT
+    # missing values are left blank rather than written as text
+    for col_idx, col in enumerate(df.columns):
+        missing = df[col].isna().to_numpy()
+        assert all(row[col_idx] is None for row, blank in zip(rows[1:], missing) if blank)
+
+
+@pytest.mark.parametrize('view', ['tickets', 'empty'])
+@pytest.mark.parametrize('compress', [False, True])
+def test_csv_round_trip(view, compress):
+    df = views()[view]
+    data = to_csv_gzip_bytes(df) if compress else to_csv_bytes(df, chunk_rows=5)
+    if compress:
+        data = gzip.decompress(data)
+    back = pd.read_csv(BytesIO(data), parse_dates=['Created Time', 'Closed Time'])
+    # an empty view still has its header row
+    assert list(back.columns) == list(df.columns)
+    if len(df):
+        assert_round_trip(df, back.astype({col: 'datetime64[us]' for col in ('Created Time', 'Closed Time')}))
+    else:
+        assert back.empty
+
+
+@pytest.mark.parametrize('view', ['tickets', 'empty'])
+def test_parquet_round_trip(view):
+    df = views()[view]
+    back = pd.read_parquet(BytesIO(to_parquet_bytes(df, chunk_rows=5)))
+    if len(df):
+        pd.testing.assert_frame_equal(df.reset_index(drop=True), back, check_index_type=False)
+    else:
+        # Parquet keeps category labels only with the rows that use them, so an
+        # empty view keeps its column types but not its category lists
+        assert back.empty and back.dtypes.astype(str).to_dict() == df.dtypes.astype(str).to_dict()
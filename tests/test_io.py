@@ -0,0 +1,152 @@
+import datetime as dt
+import os
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from ticket_io import (
+    TICKET_COLUMNS, find_ticket_header, iter_ticket_chunks, load_tickets, parse_datetimes, prune_cache, read_tickets,
+    sidecar_path,
+)
+
+BUNDLED_REPORT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'TCPL FS Report(Nov24-Nov30).xlsx')
+
+
+def test_prune_cache_keeps_most_recently_used(tmp_path):
+    for age, name in enumerate(['a', 'b', 'c', 'd']):
+        path = tmp_path / f"{name}.parquet"
+        path.write_bytes(b'x')
+        os.utime(path, ns=(0, (10 - age) * 10**9))
+    (tmp_path / 'other.duckdb').write_bytes(b'x')
+    prune_cache(str(tmp_path), '*.parquet', keep=2)
+    assert sorted(os.listdir(tmp_path)) == ['a.parquet', 'b.parquet', 'other.duckdb']
+
+
+def test_load_tickets_prunes_sidecars(tmp_path, monkeypatch):
+    monkeypatch.setattr('ticket_io.SIDECAR_MAX_FILES', 2)
+    monkeypatch.setattr('ticket_io.read_tickets', lambda source: pd.DataFrame({'Ticket Id': [source]}))
+    for name in ['w1', 'w2', 'w3']:
+        load_tickets(name, name, str(tmp_path))
+    files = os.listdir(tmp_path)
+    assert len(files) == 2
+    assert os.path.basename(sidecar_path('w1', str(tmp_path))) not in files
+    # a sidecar hit counts as a use
+    assert load_tickets('ignored', 'w3', str(tmp_path))['Ticket Id'].tolist() == ['w3']
+
+
+
+def test_parse_datetimes_fixed_format():
+    parsed, coerced = parse_datetimes(['2025-11-24 09:15:00', None, '2025-11-30 23:59:59'])
+    assert parsed.tolist()[::2] == [pd.Timestamp('2025-11-24 09:15:00'), pd.Timestamp('2025-11-30 23:59:59')]
+    assert pd.isna(parsed[1]) and coerced == 0
+
+
+def test_parse_datetimes_utc_designator_is_made_naive():
+    parsed, coerced = parse_datetimes(['2025-11-24 09:15:00', '2025-11-25T11:27:54Z'])
+    assert parsed[1] == pd.Timestamp('2025-11-25 11:27:54') and parsed.dt.tz is None
+    assert coerced == 0
+
+
+def test_parse_datetimes_mixed_offsets_are_converted_to_utc():
+    parsed, coerced = parse_datetimes(['2025-11-24 09:15:00', '2025-11-25T11:27:54+05:30', '2025-11-25T11:27:54-02:00'])
+    assert parsed.tolist()[1:] == [pd.Timestamp('2025-11-25 05:57:54'), pd.Timestamp('2025-11-25 13:27:54')]
+    assert coerced == 0
+
+
+def test_parse_datetimes_excel_serials():
+    parsed, coerced = parse_datetimes([45985.5, 45986.25, None])
+    assert parsed.tolist()[:2] == [pd.Timestamp('2025-11-24 12:00:00'), pd.Timestamp('2025-11-25 06:00:00')]
+    assert coerced == 0
+
+
+def test_parse_datetimes_counts_unreadable_values():
+    parsed, coerced = parse_datetimes([dt.datetime(2025, 11, 24, 9), 'not a date', True, -3.0, ''])
+    assert parsed[0] == pd.Timestamp('2025-11-24 09:00:00')
+    assert parsed[1:].isna().all()
+    assert coerced == 4
+
+
+def test_find_ticket_header_on_bundled_report():
+    wb = openpyxl.load_workbook(BUNDLED_REPORT, read_only=True)
+    try:
+        ws, header_row, positions = find_ticket_header(wb)
+        # the ticket sheet, not the pivot 'Data' sheet; 'Shift Timing' is not projected
+        assert ws.title == 'Tickets Summary(Nov 24-Nov 30)'
+        assert header_row == 1
+        assert positions == {
+            'Created Time': 0, 'Closed Time': 2, 'Resolution Status': 3, 'TicketType': 4,
+            'Subject': 5, 'Ticket Id': 6, 'Status': 7, 'Priority': 8,
+        }
+    finally:
+        wb.close()
+
+
+def test_read_tickets_on_bundled_report():
+    df = read_tickets(BUNDLED_REPORT)
+    assert list(df.columns) == list(TICKET_COLUMNS) + ['resolution_hours']
+    assert len(df) == 25 and df['Ticket Id'].is_unique
+    assert df.attrs['coerced_dates'] == {'Created Time': 0, 'Closed Time': 0}
+    assert df['Created Time'].is_monotonic_increasing
+    assert (df['Created Time'].iloc[0], df['Created Time'].iloc[-1]) == (
+        pd.Timestamp('2025-11-24 10:01:59'), pd.Timestamp('2025-11-29 23:00:10'),
+    )
+    assert df['Ticket Id'].iloc[0] == 48824
+    assert df['Priority'].value_counts().to_dict() == {'P3': 17, 'P4': 5, 'P2': 3}
+    assert df['resolution_hours'].iloc[0] == pytest.approx(25.431944, abs=1e-4)
+
+
+def test_find_ticket_header_below_title_rows(tmp_path, make_tickets, write_workbook):
+    path = write_workbook(
+        make_tickets(['2025-11-24 09:00:00']).drop(columns=['Subject']),
+        tmp_path / 'report.xlsx', title_rows=[['Weekly report'], []],
+    )
+    wb = openpyxl.load_workbook(path, read_only=True)
+    try:
+        _, header_row, positions = find_ticket_header(wb)
+    finally:
+        wb.close()
+    # the best partial match is used when no row has every ticket column
+    assert header_row == 3 and 'Subject' not in positions
+    assert read_tickets(path)['Ticket Id'].tolist() == [1]
+
+
+def test_find_ticket_header_without_ticket_columns(tmp_path):
+    workbook = openpyxl.Workbook()
+    workbook.active.append(['Row Labels', 'Count of Ticket Id'])
+    workbook.save(tmp_path / 'pivot.xlsx')
+    with pytest.raises(ValueError, match='No worksheet has a ticket header'):
+        read_tickets(tmp_path / 'pivot.xlsx')
+
+
+@pytest.mark.parametrize('rows, chunk_rows, sizes', [(7, 3, [3, 3, 1]), (6, 3, [3, 3]), (2, 5, [2]), (0, 3, [0])])
+def test_iter_ticket_chunks_boundaries(tmp_path, make_tickets, write_workbook, rows, chunk_rows, sizes):
+    created = [f"2025-11-{24 + i % 7} 09:00:00" for i in range(rows)]
+    path = write_workbook(make_tickets(created), tmp_path / 'export.xlsx')
+    chunks = list(iter_ticket_chunks(path, chunk_rows))
+    assert [len(chunk) for chunk in chunks] == sizes
+    # every chunk, even an empty one, carries the ticket columns
+    assert all(list(chunk.columns) == list(TICKET_COLUMNS) + ['resolution_hours'] for chunk in chunks)
+    assert [ticket_id for chunk in chunks for ticket_id in chunk['Ticket Id']] == list(range(1, rows + 1))
+
+
+def test_iter_ticket_chunks_skips_blank_rows(tmp_path, make_tickets, write_workbook):
+    path = write_workbook(make_tickets(['2025-11-24 09:00:00'] * 4), tmp_path / 'export.xlsx')
+    workbook = openpyxl.load_workbook(path)
+    workbook.active.insert_rows(3, amount=2)
+    workbook.save(path)
+    assert [len(chunk) for chunk in iter_ticket_chunks(path, 2)] == [2, 2]
+
+
+def test_read_tickets_is_independent_of_chunk_size(tmp_path, make_tickets, write_workbook):
+    created = ['2025-11-26 09:00:00', None, '2025-11-24 09:00:00', '2025-11-27 09:00:00', '2025-11-25 09:00:00']
+    path = write_workbook(make_tickets(created), tmp_path / 'export.xlsx')
+    workbook = openpyxl.load_workbook(path)
+    workbook.active['B5'] = 'not a date'
+    workbook.save(path)
+    whole = read_tickets(path)
+    chunked = read_tickets(path, chunk_rows=2)
+    pd.testing.assert_frame_equal(whole, chunked)
+    # categories are decided over all chunks, and coerced dates are summed
+    assert chunked['Priority'].cat.categories.tolist() == ['P1', 'P2', 'P4']
+    assert chunked.attrs['coerced_dates'] == whole.attrs['coerced_dates'] == {'Created Time': 1, 'Closed Time': 0}
@@ -0,0 +1,121 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from ticket_charts import bucket_trend
+from ticket_query import (
+    FilterIndex, TicketCube, apply_filters, compute_kpis, date_slice, filter_key, filter_rows, page_rows, sort_order,
+    summarize, take_rows,
+)
+from ticket_samples import synthetic_tickets
+
+
+def check_against_rows(df, keys):
+    cube, index = TicketCube(df), FilterIndex(df)
+    for key in keys:
+        view = apply_filters(df, index, key)
+        summary = cube.summarize(key)
+        assert summary['kpis'] == compute_kpis(view)
+        trend = summarize(view)['trend']
+        if trend is None:
+            assert summary['trend'] is None
+        else:
+            assert list(summary['trend'].index) == list(trend.index)
+            assert summary['trend'].tolist() == trend.tolist()
+
+
+def test_outlier_dates_do_not_widen_the_day_axis(make_tickets):
+    created = [
+        '2025-11-24 09:00:00', '2025-11-24 17:30:00', '2025-11-26 08:00:00', '2025-11-30 23:59:59',
+        '0025-11-25 10:00:00',  # typo year
+        '1970-01-01 00:00:00.000045',  # numeric cell read by the 'mixed' date fallback
+        None, '2025-11-27 12:00:00',
+    ]
+    df = make_tickets(created)
+    cube = TicketCube(df)
+    # six distinct creation days plus the undated slot
+    assert cube.counts.shape[-1] == 7
+    check_against_rows(df, [
+        filter_key([], [], [], None, None),
+        filter_key([], [], [], dt.date(2025, 11, 24), dt.date(2025, 11, 26)),
+        filter_key(['P4'], [], [], dt.date(2025, 11, 25), dt.date(2025, 11, 29)),
+        filter_key([], [], [], dt.date(1, 1, 1), dt.date(2025, 11, 24)),
+        filter_key([], [], [], dt.date(2025, 12, 1), dt.date(2025, 12, 31)),
+    ])
+
+
+def test_row_summary_trend_feeds_bucket_trend(make_tickets):
+    df = make_tickets(pd.date_range('2025-01-01 10:00', periods=200, freq='D').strftime('%Y-%m-%d %H:%M:%S'))
+    trend = summarize(df)['trend']
+    assert isinstance(trend.index, pd.DatetimeIndex)
+    # a window over 92 days resamples the daily counts into weeks
+    weekly, label = bucket_trend(trend, df, pd.Timestamp('2025-01-01'), pd.Timestamp('2025-07-19'))
+    assert label == 'Week' and weekly.sum() == 200
+
+
+def test_date_window_is_ignored_without_created_time(make_tickets):
+    df = make_tickets(['2025-11-24 09:00:00', '2025-11-25 09:00:00', None]).drop(columns=['Created Time'])
+    check_against_rows(df, [filter_key([], [], [], dt.date(2025, 11, 24), dt.date(2025, 11, 24))])
+    assert TicketCube(df).summarize(filter_key([], [], [], dt.date(2025, 11, 24), dt.date(2025, 11, 24)))['kpis'].total_tickets == 3
+
+
+def test_filter_index_matches_isin():
+    df = synthetic_tickets(1_001, days=30, missing=0.1)
+    index = FilterIndex(df)
+    assert index.select({'Priority': [], 'TicketType': []}) is None
+    for filters in (
+        {'Priority': ['P4']},
+        {'Priority': ['P1', 'P3'], 'Resolution Status': ['Within SLA']},
+        {'Priority': ['P2'], 'TicketType': ['Bug (Tech)', 'Not a Task (Info Only)'], 'Resolution Status': []},
+        {'Priority': ['P9']},
+    ):
+        expected = np.logical_and.reduce([df[column].isin(labels).to_numpy() for column, labels in filters.items() if labels])
+        assert np.array_equal(index.select(filters), expected)
+
+
+def test_date_slice_includes_the_whole_last_day(make_tickets):
+    df = make_tickets([
+        '2025-11-23 23:59:59', '2025-11-24 00:00:00', '2025-11-25 12:00:00',
+        '2025-11-26 00:00:00', '2025-11-26 23:59:59.999999', '2025-11-27 00:00:00', None,
+    ])
+    rows = date_slice(df['Created Time'], dt.date(2025, 11, 24), dt.date(2025, 11, 26))
+    assert df['Created Time'].iloc[rows].tolist() == [
+        pd.Timestamp('2025-11-24 00:00:00'), pd.Timestamp('2025-11-25 12:00:00'),
+        pd.Timestamp('2025-11-26 00:00:00'), pd.Timestamp('2025-11-26 23:59:59.999999'),
+    ]
+    # a ticket after midnight on a single-day window is included; times within the bounds are ignored
+    single = date_slice(df['Created Time'], pd.Timestamp('2025-11-26 18:00'), pd.Timestamp('2025-11-26 06:00'))
+    assert (single.start, single.stop) == (3, 5)
+    assert date_slice(df['Created Time'], dt.date(2025, 12, 1), dt.date(2025, 12, 31)) == slice(6, 6)
+
+
+def test_sort_order_and_page_rows_match_sort_values(make_tickets):
+    df = make_tickets(
+        ['2025-11-24 09:00:00', '2025-11-24 10:00:00', '2025-11-25 09:00:00', None, '2025-11-26 09:00:00', None],
+        Subject=['d', None, 'b', 'a', 'c', 'b'],
+    )
+    for column in ('Created Time', 'Subject', 'Priority'):
+        for ascending in (True, False):
+            expected = df.sort_values(column, ascending=ascending, kind='stable', na_position='last')
+            order = sort_order(df, column, ascending)
+            assert df['Ticket Id'].take(order).tolist() == expected['Ticket Id'].tolist(), (column, ascending)
+            pages = [page_rows(df, order, page, 4) for page in (1, 2)]
+            assert [list(page.index) for page in pages] == [[0, 1, 2, 3], [4, 5]]
+            assert pd.concat(pages)['Ticket Id'].tolist() == expected['Ticket Id'].tolist()
+
+
+def test_page_rows_over_view_positions():
+    df = synthetic_tickets(500, days=30, missing=0.1, undated=0.05)
+    index = FilterIndex(df)
+    for key in (
+        filter_key([], [], [], None, None),
+        filter_key([], [], [], dt.date(2025, 1, 5), dt.date(2025, 1, 20)),
+        filter_key(['P2', 'P3'], [], ['Within SLA'], dt.date(2025, 1, 5), dt.date(2025, 1, 20)),
+    ):
+        rows = filter_rows(df, index, key)
+        view = take_rows(df, rows)
+        order = sort_order(take_rows(df[['Subject']], rows), 'Subject', False)
+        # pages gathered through the view's positions equal pages of the materialized view
+        for page in (1, 3):
+            pd.testing.assert_frame_equal(page_rows(df, order, page, 25, rows), page_rows(view, order, page, 25))
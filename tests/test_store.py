@@ -0,0 +1,127 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from ticket_store import (
+    history_bounds, ingest_workbooks, merge_tickets, parse_workbooks, read_history, upsert_tickets,
+)
+
+
+def status(store, ticket_id):
+    history = read_history(store)
+    return history.loc[history['Ticket Id'] == ticket_id, 'Status'].tolist()
+
+
+@pytest.fixture
+def week_a(make_tickets):
+    return make_tickets(
+        ['2025-01-06 09:00:00', '2025-01-08 09:00:00'],
+        **{'Closed Time': ['2025-01-07 10:00:00', None]},
+    )
+
+
+@pytest.fixture
+def week_b(make_tickets):
+    # a later export: ticket 1 reopened with the same Closed Time, a new ticket 3
+    return make_tickets(
+        ['2025-01-06 09:00:00', '2025-01-08 09:00:00', '2025-01-14 09:00:00'],
+        **{'Closed Time': ['2025-01-07 10:00:00', None, None], 'Status': ['Reopened', 'Open', 'Open']},
+    )
+
+
+def test_insert_then_reingest_is_a_no_op(tmp_path, week_a):
+    assert upsert_tickets(week_a, tmp_path) == (2, 0)
+    assert upsert_tickets(week_a, tmp_path) == (0, 0)
+    assert sorted(read_history(tmp_path)['Ticket Id']) == [1, 2]
+
+
+def test_newer_export_updates_and_older_never_rolls_back(tmp_path, week_a, week_b):
+    upsert_tickets(week_a, tmp_path)
+    assert upsert_tickets(week_b, tmp_path) == (1, 1)
+    assert status(tmp_path, 1) == ['Reopened']
+    # re-ingesting the older export changes nothing
+    assert upsert_tickets(week_a, tmp_path) == (0, 0)
+    assert status(tmp_path, 1) == ['Reopened']
+
+
+def test_older_export_is_stale(tmp_path, make_tickets):
+    upsert_tickets(make_tickets(['2025-01-06 09:00:00'], **{'Closed Time': ['2025-01-09 10:00:00']}), tmp_path)
+    # taken on 2025-01-08, before the stored export
+    stale = make_tickets(
+        ['2025-01-06 09:00:00', '2025-01-08 09:00:00'],
+        **{'Closed Time': ['2025-01-07 10:00:00', None], 'Status': ['Resolved', 'Open']},
+    )
+    assert upsert_tickets(stale, tmp_path) == (1, 0)
+    assert status(tmp_path, 1) == ['Closed']
+    closing = make_tickets(['2025-01-08 09:00:00'], **{'Ticket Id': [2], 'Closed Time': ['2025-02-02 09:00:00']})
+    assert upsert_tickets(closing, tmp_path) == (0, 1)
+    assert status(tmp_path, 2) == ['Closed']
+
+
+def test_equally_recent_exports_keep_the_later_closed_time(tmp_path, make_tickets):
+    created = ['2025-01-06 09:00:00', '2025-01-20 09:00:00']
+    upsert_tickets(make_tickets(created, **{'Closed Time': ['2025-01-09 10:00:00', None]}), tmp_path)
+    same_time = make_tickets(
+        created, **{'Closed Time': ['2025-01-07 10:00:00', None], 'Status': ['Resolved', 'Open']},
+    )
+    assert upsert_tickets(same_time, tmp_path) == (0, 0)
+    assert status(tmp_path, 1) == ['Closed']
+
+
+def test_reopened_ticket_from_a_newer_export_replaces_the_closed_one(tmp_path, make_tickets, week_a):
+    upsert_tickets(week_a, tmp_path)
+    reopened = make_tickets(
+        ['2025-01-06 09:00:00', '2025-01-14 09:00:00'],
+        **{'Ticket Id': [1, 3], 'Closed Time': [None, None], 'Status': ['Reopened', 'Open']},
+    )
+    assert upsert_tickets(reopened, tmp_path) == (1, 1)
+    assert status(tmp_path, 1) == ['Reopened']
+    assert upsert_tickets(week_a, tmp_path) == (0, 0)
+    assert status(tmp_path, 1) == ['Reopened']
+    # merging the exports directly agrees, in either order
+    for frames in ([week_a, reopened], [reopened, week_a]):
+        merged = merge_tickets(frames)
+        assert merged.loc[merged['Ticket Id'] == 1, 'Status'].tolist() == ['Reopened']
+
+
+def test_ingest_orders_uploads_by_export_time(tmp_path, week_a, week_b, write_workbook):
+    # the newer export is listed first, but the older one is applied first
+    sources = [str(write_workbook(week_b, tmp_path / 'b.xlsx')), str(write_workbook(week_a, tmp_path / 'a.xlsx'))]
+    store = tmp_path / 'history'
+    assert ingest_workbooks(sources, store, max_workers=1) == (3, 1)
+    assert status(store, 1) == ['Reopened']
+
+
+def test_month_partitions_are_pruned_on_read(tmp_path, make_tickets):
+    upsert_tickets(make_tickets(
+        ['2025-01-06 09:00:00', '2025-02-10 09:00:00', '2025-03-03 09:00:00', None],
+        **{'Closed Time': [None] * 4},
+    ), tmp_path)
+    assert sorted(path.parent.name for path in tmp_path.glob('created_month=*/*.parquet')) == [
+        'created_month=2025-01', 'created_month=2025-02', 'created_month=2025-03', 'created_month=none',
+    ]
+    assert sorted(read_history(tmp_path, '2025-02-01', '2025-02-28')['Ticket Id']) == [2]
+    assert sorted(read_history(tmp_path, '2025-01-15', '2025-02-15')['Ticket Id']) == [1, 2]
+    assert sorted(read_history(tmp_path)['Ticket Id']) == [1, 2, 3, 4]
+    assert history_bounds(tmp_path) == (pd.Timestamp('2025-01-06 09:00:00'), pd.Timestamp('2025-03-03 09:00:00'))
+
+
+def test_concurrent_upserts_do_not_lose_tickets(tmp_path, make_tickets):
+    weeks = [
+        make_tickets([f"2025-01-{week + 1:02d} 09:00:00"] * 20, **{'Ticket Id': [week * 100 + i for i in range(20)]})
+        for week in range(8)
+    ]
+    threads = [threading.Thread(target=upsert_tickets, args=(week, tmp_path)) for week in weeks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(list(tmp_path.glob('created_month=*/*.parquet'))) == len(weeks)
+    assert sorted(read_history(tmp_path)['Ticket Id']) == sorted(week * 100 + i for week in range(8) for i in range(20))
+
+
+def test_parse_workbooks_in_worker_processes(tmp_path, week_a, week_b, write_workbook):
+    paths = [str(write_workbook(week_a, tmp_path / 'a.xlsx')), str(write_workbook(week_b, tmp_path / 'b.xlsx'))]
+    frames = parse_workbooks(paths, max_workers=2)
+    assert [sorted(frame['Ticket Id']) for frame in frames] == [[1, 2], [1, 2, 3]]
@@ -0,0 +1,354 @@
+"""Query backends behind the dashboard's filters, KPIs and chart aggregates.
+
+Every backend is built once per dataset and answers a ``filter_key`` with
+
+* ``summarize(key)`` - the Kpis record plus priority / ticket type / daily
+  counts, in the shape ``TicketCube.summarize`` returns,
+* ``positions(key)`` - the filtered rows' positions in the loaded dataset
+  (a positional slice or an ascending int64 array, see
+  ``ticket_query.select_rows``), and
+* ``rows(key)`` - the filtered tickets in the order, index and dtypes of the
+  loaded dataset, as ``apply_filters`` returns them.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ticket_io import (
+    CATEGORY_COLUMNS, DATE_COLUMNS, DATETIME_FORMAT, SIDECAR_DIR, SIDECAR_VERSION, prune_cache, touch_cache_file,
+)
+from ticket_query import FilterIndex, Kpis, TicketCube, filter_rows, matching_codes, take_rows
+
+# DuckDB is a columnar engine and much faster on aggregates; SQLite ships with
+# Python and is used when DuckDB is not installed.
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Polars is optional too; its engine is only offered when it is installed.
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+
+class PandasBackend:
+    """In-process backend: row bitmaps for the filters, the cube for aggregates."""
+
+    def __init__(self, df, fingerprint=None):
+        self.df = df
+        self.index = FilterIndex(df)
+        self.cube = TicketCube(df)
+
+    def summarize(self, key):
+        return self.cube.summarize(key)
+
+    def positions(self, key):
+        return filter_rows(self.df, self.index, key)
+
+    def rows(self, key):
+        return take_rows(self.df, self.positions(key))
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+def _sql_type(dtype):
+    """Column type for a pandas dtype; anything not numeric or datetime is stored as text."""
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'TIMESTAMP'
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'BOOLEAN'
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'BIGINT'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'DOUBLE'
+    return 'VARCHAR'
+
+
+class SqlBackend:
+    """Backend over an embedded database file (DuckDB, or SQLite as a fallback).
+
+    The dataset is copied once into ``<cache_dir>/<hash>.duckdb`` (or
+    ``.sqlite``), named after the fingerprint, schema and SIDECAR_VERSION, and
+    reused from there on later runs; like the sidecars, only the
+    SIDECAR_MAX_FILES most recently used database files are kept. Filters compile to a
+    parameterized WHERE clause, so the database evaluates them and only the
+    aggregates, or the filtered row positions, come back to the app.
+    """
+
+    TABLE = 'tickets'
+
+    def __init__(self, df, fingerprint, cache_dir=SIDECAR_DIR):
+        self.dialect = 'duckdb' if duckdb is not None else 'sqlite'
+        self.df = df
+        self.columns = list(df.columns)
+        # a new layout or schema gets a new file instead of reusing a stale one
+        schema = [(col, str(dtype)) for col, dtype in df.dtypes.items()]
+        key = hashlib.sha256(f"v{SIDECAR_VERSION}:{schema!r}:{fingerprint}".encode()).hexdigest()
+        self.path = os.path.join(cache_dir, f"{key}.{self.dialect}")
+        if os.path.exists(self.path):
+            touch_cache_file(self.path)
+        else:
+            self._build(df)
+            prune_cache(cache_dir, f"*.{self.dialect}")
+        # connect right away: the open connection keeps working if the file is
+        # pruned later while this backend is still cached
+        if self.dialect == 'duckdb':
+            self._connection = duckdb.connect(self.path, read_only=True)
+        else:
+            self._connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _build(self, df):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        table = df.copy()
+        # position in the loaded frame: restores its order and index on the way back
+        table['_row'] = np.arange(len(table), dtype=np.int64)
+        for col in CATEGORY_COLUMNS:
+            if col in table.columns:
+                table[col] = table[col].astype(object)
+        if 'resolution_hours' in table.columns:
+            # nullable float so open tickets are stored as NULL, not NaN
+            table['resolution_hours'] = table['resolution_hours'].astype('Float32')
+        # build under a temporary name so a half-written database is never picked up
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if self.dialect == 'duckdb':
+            # declare the column types: DuckDB would type an all-None column as INTEGER
+            schema = ', '.join(f"{_quote(col)} {_sql_type(dtype)}" for col, dtype in table.dtypes.items())
+            with duckdb.connect(tmp_path) as con:
+                con.execute(f"CREATE TABLE {self.TABLE} ({schema})")
+                con.register('frame', table)
+                con.execute(f"INSERT INTO {self.TABLE} SELECT * FROM frame")
+        else:
+            for col in DATE_COLUMNS:
+                if col in table.columns:
+                    table[col] = table[col].dt.strftime(DATETIME_FORMAT)
+            con = sqlite3.connect(tmp_path)
+            try:
+                table.to_sql(self.TABLE, con, index=False)
+                if 'Created Time' in table.columns:
+                    con.execute(f"CREATE INDEX created_time ON {self.TABLE} ({_quote('Created Time')})")
+                con.commit()
+            finally:
+                con.close()
+        os.replace(tmp_path, self.path)
+
+    def _query(self, sql, params):
+        if self.dialect == 'duckdb':
+            # DuckDB connections are not shared between Streamlit's session
+            # threads; each thread queries through its own cursor
+            if not hasattr(self._local, 'cursor'):
+                self._local.cursor = self._connection.cursor()
+            return self._local.cursor.execute(sql, params).df()
+        with self._lock:
+            cursor = self._connection.execute(sql, params)
+            names = [description[0] for description in cursor.description]
+            return pd.DataFrame(cursor.fetchall(), columns=names)
+
+    def _where(self, key, *extra):
+        """``(' WHERE ...', params)`` for a filter_key plus any ``extra`` clauses."""
+        priorities, ticket_types, sla_statuses, start_date, end_date = key
+        clauses, params = [], []
+        for column, labels in (('Priority', priorities), ('TicketType', ticket_types), ('Resolution Status', sla_statuses)):
+            if not labels:
+                continue
+            if column not in self.columns:
+                # same as the pandas path: a filter on a missing column matches nothing
+                clauses.append('1 = 0')
+                continue
+            clauses.append(f"{_quote(column)} IN ({', '.join('?' for _ in labels)})")
+            params.extend(labels)
+        if start_date is not None and 'Created Time' in self.columns:
+            # whole days, end inclusive: [start 00:00, day after end 00:00)
+            start = pd.Timestamp(start_date).normalize()
+            stop = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+            clauses.append(f"{_quote('Created Time')} >= ? AND {_quote('Created Time')} < ?")
+            params.extend(
+                [value.strftime(DATETIME_FORMAT) for value in (start, stop)] if self.dialect == 'sqlite'
+                else [value.to_pydatetime() for value in (start, stop)]
+            )
+        clauses.extend(extra)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def _counts(self, column, key):
+        if column not in self.columns:
+            return None
+        col = _quote(column)
+        where, params = self._where(key, f"{col} IS NOT NULL")
+        # most frequent first, ties in category (sorted label) order like category_counts
+        counts = self._query(
+            f"SELECT {col} AS label, COUNT(*) AS n FROM {self.TABLE}{where} GROUP BY {col} ORDER BY n DESC, label",
+            params,
+        )
+        if counts.empty:
+            return None
+        return pd.Series(counts['n'].to_numpy(dtype=np.int64), index=pd.Index(counts['label'].tolist(), name=column), name='count')
+
+    def _daily(self, key):
+        if 'Created Time' not in self.columns:
+            return None
+        created = _quote('Created Time')
+        day = f"CAST({created} AS DATE)" if self.dialect == 'duckdb' else f"date({created})"
+        where, params = self._where(key, f"{created} IS NOT NULL")
+        trend = self._query(f"SELECT {day} AS day, COUNT(*) AS n FROM {self.TABLE}{where} GROUP BY day ORDER BY day", params)
+        if trend.empty:
+            return None
+        return pd.Series(
+            trend['n'].to_numpy(dtype=np.int64),
+            index=pd.DatetimeIndex(pd.to_datetime(trend['day']).to_numpy('datetime64[us]'), name='Created Time'),
+        )
+
+    def summarize(self, key):
+        within = p4 = '0'
+        if 'Resolution Status' in self.columns:
+            within = f"COALESCE(SUM(CASE WHEN lower({_quote('Resolution Status')}) LIKE '%within%' THEN 1 ELSE 0 END), 0)"
+        if 'Priority' in self.columns:
+            p4 = f"COALESCE(SUM(CASE WHEN {_quote('Priority')} = 'P4' THEN 1 ELSE 0 END), 0)"
+        hours = 'AVG(resolution_hours)' if 'resolution_hours' in self.columns else 'NULL'
+        where, params = self._where(key)
+        total, within_sla, p4_tickets, avg_hours = self._query(
+            f"SELECT COUNT(*), {within}, {p4}, {hours} FROM {self.TABLE}{where}", params
+        ).iloc[0].tolist()
+        total = int(total)
+        within_sla = int(within_sla)
+        return {
+            'kpis': Kpis(
+                total_tickets=total,
+                within_sla=within_sla,
+                sla_percentage=(within_sla / total * 100) if total > 0 else 0,
+                avg_resolution_hours=None if avg_hours is None or pd.isna(avg_hours) else round(float(avg_hours), 2),
+                p4_tickets=int(p4_tickets),
+            ),
+            'priority_counts': self._counts('Priority', key),
+            'type_counts': self._counts('TicketType', key),
+            'trend': self._daily(key),
+        }
+
+    def positions(self, key):
+        where, params = self._where(key)
+        rows = self._query(f"SELECT _row FROM {self.TABLE}{where} ORDER BY _row", params)
+        return rows['_row'].to_numpy(dtype=np.int64)
+
+    def rows(self, key):
+        # only the positions cross the connection; the rows come from the
+        # loaded frame, so they keep its index, dtypes and category sets
+        return take_rows(self.df, self.positions(key))
+
+
+class PolarsBackend:
+    """Backend running every filter_key as one Polars lazy query.
+
+    The filter and aggregate columns are converted to a Polars frame once per
+    dataset. Per query, the ``is_in`` and date window predicates feed the KPI,
+    priority, type and daily aggregations as a single plan: ``collect_all``
+    evaluates the shared filter once and runs the aggregations on Polars'
+    thread pool. Rows are selected by position from the loaded frame, so they
+    come back exactly as the pandas path returns them.
+    """
+
+    COLUMNS = ('Priority', 'TicketType', 'Resolution Status', 'Created Time', 'resolution_hours')
+
+    def __init__(self, df, fingerprint=None):
+        self.df = df
+        self.columns = list(df.columns)
+        present = [col for col in self.COLUMNS if col in df.columns]
+        self.frame = pl.from_pandas(df[present], nan_to_null=True).with_row_index('_row').lazy()
+        # SLA statuses counted as within SLA, matched once per category like compute_kpis
+        self.within_labels = []
+        if 'Resolution Status' in df.columns:
+            status = df['Resolution Status']
+            self.within_labels = status.cat.categories[matching_codes(status, 'Within')].tolist()
+
+    def _filtered(self, key):
+        priorities, ticket_types, sla_statuses, start_date, end_date = key
+        predicates = []
+        for column, labels in (('Priority', priorities), ('TicketType', ticket_types), ('Resolution Status', sla_statuses)):
+            if labels:
+                predicates.append(pl.col(column).is_in(list(labels)) if column in self.columns else pl.lit(False))
+        if start_date is not None and 'Created Time' in self.columns:
+            # whole days, end inclusive: [start 00:00, day after end 00:00)
+            start = pd.Timestamp(start_date).normalize()
+            stop = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+            predicates.append(pl.col('Created Time').is_between(start.to_pydatetime(), stop.to_pydatetime(), closed='left'))
+        return self.frame.filter(*predicates) if predicates else self.frame
+
+    def _counts(self, filtered, column):
+        if column not in self.columns:
+            return None
+        # most frequent first, ties in category (sorted label) order like category_counts
+        return (
+            filtered.filter(pl.col(column).is_not_null())
+            .group_by(pl.col(column).alias('label'))
+            .agg(pl.len().alias('n'))
+            .with_columns(pl.col('label').cast(pl.String))
+            .sort(['n', 'label'], descending=[True, False])
+        )
+
+    def summarize(self, key):
+        filtered = self._filtered(key)
+        kpis = [pl.len().alias('total')]
+        kpis.append(
+            pl.col('Resolution Status').is_in(self.within_labels).sum().alias('within')
+            if 'Resolution Status' in self.columns else pl.lit(0).alias('within')
+        )
+        kpis.append((pl.col('Priority') == 'P4').sum().alias('p4') if 'Priority' in self.columns else pl.lit(0).alias('p4'))
+        kpis.append(
+            pl.col('resolution_hours').cast(pl.Float64).mean().alias('hours')
+            if 'resolution_hours' in self.columns else pl.lit(None, dtype=pl.Float64).alias('hours')
+        )
+        queries = {'kpis': filtered.select(kpis)}
+        for part, column in (('priority_counts', 'Priority'), ('type_counts', 'TicketType')):
+            counts = self._counts(filtered, column)
+            if counts is not None:
+                queries[part] = counts
+        if 'Created Time' in self.columns:
+            queries['trend'] = (
+                filtered.filter(pl.col('Created Time').is_not_null())
+                .group_by(pl.col('Created Time').dt.date().alias('day'))
+                .agg(pl.len().alias('n'))
+                .sort('day')
+            )
+        results = dict(zip(queries, pl.collect_all(list(queries.values()))))
+
+        total, within_sla, p4_tickets, avg_hours = results['kpis'].row(0)
+        summary = {'kpis': Kpis(
+            total_tickets=int(total),
+            within_sla=int(within_sla),
+            sla_percentage=(within_sla / total * 100) if total > 0 else 0,
+            avg_resolution_hours=None if avg_hours is None else round(float(avg_hours), 2),
+            p4_tickets=int(p4_tickets),
+        )}
+        for part, column in (('priority_counts', 'Priority'), ('type_counts', 'TicketType')):
+            counts = results.get(part)
+            summary[part] = None if counts is None or counts.is_empty() else pd.Series(
+                counts['n'].to_numpy().astype(np.int64), index=pd.Index(counts['label'].to_list(), name=column), name='count',
+            )
+        trend = results.get('trend')
+        summary['trend'] = None if trend is None or trend.is_empty() else pd.Series(
+            trend['n'].to_numpy().astype(np.int64),
+            index=pd.DatetimeIndex(trend['day'].to_numpy().astype('datetime64[us]'), name='Created Time'),
+        )
+        return summary
+
+    def positions(self, key):
+        return self._filtered(key).select('_row').collect()['_row'].to_numpy().astype(np.int64)
+
+    def rows(self, key):
+        return take_rows(self.df, self.positions(key))
+
+
+# Engines offered in the sidebar, keyed by their label
+BACKENDS = {
+    'pandas': PandasBackend,
+    'SQL (DuckDB)' if duckdb is not None else 'SQL (SQLite)': SqlBackend,
+}
+if pl is not None:
+    BACKENDS['Polars'] = PolarsBackend
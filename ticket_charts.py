@@ -0,0 +1,117 @@
+"""Chart data preparation and figure builders for the ticket dashboard."""
+import hashlib
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+# (widest window in days, pandas frequency, axis label) for the Tickets Over
+# Time trend; the first row whose width covers the selected window is used.
+TREND_BUCKETS = (
+    (2, 'h', 'Hour'),
+    (92, 'D', 'Day'),
+    (730, 'W-MON', 'Week'),
+    (None, 'MS', 'Month'),
+)
+# Upper bound on plotted trend points; longer series are downsampled with LTTB.
+MAX_TREND_POINTS = 400
+# Markers are only drawn on short series, where they are still readable.
+TREND_MARKER_POINTS = 60
+
+
+def trend_bucket(start, end):
+    """``(frequency, label)`` for a trend covering ``start`` .. ``end`` (whole days, inclusive)."""
+    span = (pd.Timestamp(end).normalize() - pd.Timestamp(start).normalize()).days + 1
+    for max_days, freq, label in TREND_BUCKETS:
+        if max_days is None or span <= max_days:
+            return freq, label
+
+
+def hourly_counts(created):
+    """Ticket counts per hour for a Created Time column."""
+    times = created.to_numpy()
+    hours, counts = np.unique(times[~np.isnat(times)].astype('datetime64[h]'), return_counts=True)
+    return pd.Series(counts, index=pd.DatetimeIndex(hours, name='Created Time'))
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the positions of at most ``threshold`` points of the series
+    ``(x, y)`` that preserve its visual shape; first and last points are kept.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # average of the next bucket (or the last point) is the third triangle vertex
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nxt_lo:nxt_hi].mean()
+        avg_y = y[nxt_lo:nxt_hi].mean()
+        area = np.abs(
+            (x[previous] - avg_x) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (avg_y - y[previous])
+        )
+        previous = lo + int(area.argmax())
+        keep[i + 1] = previous
+    return keep
+
+
+def bucket_trend(daily, view, start=None, end=None, max_points=MAX_TREND_POINTS):
+    """Tickets Over Time series for the selected window.
+
+    ``daily`` holds per-day counts on a datetime64 index (as produced by
+    TicketCube.summarize); ``view`` is the filtered frame, only read for hourly
+    buckets, which the daily aggregate cannot provide. Returns
+    ``(series, label)``, or ``(None, None)`` when there is nothing to plot.
+    """
+    if daily is None or daily.empty:
+        return None, None
+    if start is None:
+        start, end = daily.index[0], daily.index[-1]
+    freq, label = trend_bucket(start, end)
+    if freq == 'h':
+        trend = hourly_counts(view['Created Time'])
+    elif freq == 'D':
+        trend = daily
+    else:
+        trend = daily.resample(freq, label='left', closed='left').sum()
+    if len(trend) > max_points:
+        trend = trend.iloc[lttb(trend.index.asi8, trend.to_numpy(), max_points)]
+    return trend, label
+
+
+def table_fingerprint(table):
+    """Content hash of a (small) aggregate table: column names, index and values."""
+    digest = hashlib.sha256(repr(list(table.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(table, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def priority_figure(table, title):
+    return px.bar(table, x='Priority', y='Count', title=title, text='Count')
+
+
+def type_figure(table, title):
+    return px.pie(table, names='TicketType', values='Count', title=title)
+
+
+def trend_figure(table, title):
+    # the first column is named after the time bucket (Hour, Day, ...) so the
+    # axis label follows it
+    return px.line(table, x=table.columns[0], y='Count', title=title, markers=len(table) <= TREND_MARKER_POINTS)
+
+
+FIGURE_BUILDERS = {
+    'priority': priority_figure,
+    'type': type_figure,
+    'trend': trend_figure,
+}
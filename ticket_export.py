@@ -0,0 +1,130 @@
+"""Download exports of the filtered ticket view."""
+import gzip
+import tempfile
+from collections import namedtuple
+from io import BytesIO
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ticket_io import DATETIME_FORMAT
+
+# XlsxWriter writes workbooks several times faster than openpyxl and can stream
+# rows in constant memory; fall back to openpyxl (already needed to read the
+# uploads) when it is not installed.
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+EXCEL_MIME = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Rows converted to Python values per step of the streaming writer.
+EXPORT_CHUNK_ROWS = 5_000
+# Exports stay in memory up to this size and roll over to a temp file beyond it.
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+EXCEL_DATETIME_FORMAT = 'yyyy-mm-dd hh:mm:ss'
+EXCEL_FLOAT_FORMAT = '0.00'
+
+
+def _cell_values(series):
+    """Column values as Python objects, with missing values as None (left blank)."""
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def write_excel_stream(df_to_export, sheet_name='Filtered', chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write ``df_to_export`` as XLSX into a spooled temp file and return it rewound.
+
+    XlsxWriter's constant_memory mode flushes every row to disk as soon as the
+    next one starts, and rows are converted ``chunk_rows`` at a time, so memory
+    use does not grow with the export beyond the spooled output itself. Date
+    columns are written as real Excel datetimes with a date format.
+    """
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    worksheet = workbook.add_worksheet(sheet_name)
+    header_format = workbook.add_format({'bold': True})
+    datetime_format = workbook.add_format({'num_format': EXCEL_DATETIME_FORMAT})
+    float_format = workbook.add_format({'num_format': EXCEL_FLOAT_FORMAT})
+
+    formats = []
+    for col_idx, (name, dtype) in enumerate(df_to_export.dtypes.items()):
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            formats.append(datetime_format)
+            worksheet.set_column(col_idx, col_idx, 19)
+        elif pd.api.types.is_float_dtype(dtype):
+            formats.append(float_format)
+        else:
+            formats.append(None)
+            if name == 'Subject':
+                worksheet.set_column(col_idx, col_idx, 60)
+    worksheet.write_row(0, 0, list(df_to_export.columns), header_format)
+
+    row_idx = 1
+    for start in range(0, len(df_to_export), chunk_rows):
+        chunk = df_to_export.iloc[start:start + chunk_rows]
+        for row in zip(*(_cell_values(chunk[col]) for col in chunk.columns)):
+            for col_idx, value in enumerate(row):
+                if value is not None:
+                    worksheet.write(row_idx, col_idx, value, formats[col_idx])
+            row_idx += 1
+    workbook.close()
+    output.seek(0)
+    return output
+
+
+def _read_spooled(output):
+    """The spooled export as bytes (the one copy the download needs), closing the file."""
+    output.seek(0)
+    with output:
+        return output.read()
+
+
+def to_excel_bytes(df_to_export):
+    if xlsxwriter is not None:
+        return _read_spooled(write_excel_stream(df_to_export))
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df_to_export.to_excel(writer, index=False, sheet_name='Filtered')
+    return output.getvalue()
+
+
+def to_csv_bytes(df_to_export, compress=False, chunk_rows=EXPORT_CHUNK_ROWS):
+    """CSV export written ``chunk_rows`` rows at a time, optionally gzip-compressed."""
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    stream = gzip.GzipFile(fileobj=output, mode='wb') if compress else output
+    # always write at least the header, even for an empty view
+    for start in range(0, max(len(df_to_export), 1), chunk_rows):
+        chunk = df_to_export.iloc[start:start + chunk_rows]
+        stream.write(chunk.to_csv(index=False, header=start == 0, date_format=DATETIME_FORMAT).encode('utf-8'))
+    if compress:
+        stream.close()
+    return _read_spooled(output)
+
+
+def to_csv_gzip_bytes(df_to_export):
+    return to_csv_bytes(df_to_export, compress=True)
+
+
+def to_parquet_bytes(df_to_export, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Parquet export with one row group per ``chunk_rows`` rows."""
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    schema = pa.Schema.from_pandas(df_to_export, preserve_index=False)
+    with pq.ParquetWriter(output, schema) as writer:
+        for start in range(0, len(df_to_export), chunk_rows):
+            chunk = df_to_export.iloc[start:start + chunk_rows]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    return _read_spooled(output)
+
+
+ExportFormat = namedtuple('ExportFormat', 'name write file_name mime')
+
+# Download formats offered by the dashboard, keyed by the selector label
+EXPORT_FORMATS = {
+    'Excel (.xlsx)': ExportFormat('Excel', to_excel_bytes, 'filtered_tickets.xlsx', EXCEL_MIME),
+    'CSV (.csv)': ExportFormat('CSV', to_csv_bytes, 'filtered_tickets.csv', 'text/csv'),
+    'Compressed CSV (.csv.gz)': ExportFormat('compressed CSV', to_csv_gzip_bytes, 'filtered_tickets.csv.gz', 'application/gzip'),
+    'Parquet (.parquet)': ExportFormat('Parquet', to_parquet_bytes, 'filtered_tickets.parquet', 'application/vnd.apache.parquet'),
+}
@@ -0,0 +1,309 @@
+"""Workbook ingestion helpers for the ticket dashboard."""
+import glob
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import openpyxl
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+TICKET_COLUMNS = (
+    'Ticket Id', 'Created Time', 'Closed Time', 'Priority',
+    'Resolution Status', 'Status', 'Subject', 'TicketType',
+)
+DATE_COLUMNS = ('Created Time', 'Closed Time')
+# Low-cardinality fields kept as pandas categoricals. Categories are sorted so
+# the code assigned to a value (and the order filters/charts list them in) is
+# stable across workbooks.
+CATEGORY_COLUMNS = ('Priority', 'TicketType', 'Resolution Status', 'Status')
+# Text layout the ticket export uses for DATE_COLUMNS, e.g. 2025-11-25 11:27:54
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Numeric date cells are Excel serial days counted from this epoch; the upper
+# bound is 9999-12-31.
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+EXCEL_MAX_SERIAL = 2_958_466
+
+# How far down each sheet to look for the ticket header row. The exports put
+# it on the first row, but a title banner above it should not break detection.
+HEADER_SCAN_ROWS = 20
+
+# Rows are streamed out of the worksheet XML and typed in chunks of this size,
+# so at most one chunk of raw cell values is alive at a time.
+INGEST_CHUNK_ROWS = 20_000
+
+# Normalized frames are persisted as Parquet sidecars so a workbook is only
+# parsed through openpyxl once. Bump SIDECAR_VERSION whenever read_tickets
+# changes the shape or dtypes of its output so stale sidecars are ignored.
+SIDECAR_DIR = os.environ.get('TICKET_CACHE_DIR', '.ticket_cache')
+SIDECAR_VERSION = 6
+SIDECAR_ATTRS_KEY = b'ticket_io.attrs'
+# Each kind of cache file (sidecars, query databases) is capped at this many
+# files; the least recently used ones beyond it are deleted.
+SIDECAR_MAX_FILES = 8
+
+
+def source_fingerprint(source):
+    """Return a cheap identity for a data source.
+
+    Uploaded files are keyed by a hash of their bytes; files on disk (the
+    DEFAULT_DATAFILE fallback) by path, mtime and size so they are not re-read
+    just to be hashed.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        stat = os.stat(source)
+        return f"file:{os.path.abspath(source)}:{stat.st_mtime_ns}:{stat.st_size}"
+    return "sha256:" + hashlib.sha256(source.getvalue()).hexdigest()
+
+
+def find_ticket_header(wb, scan_rows=HEADER_SCAN_ROWS):
+    """Locate the ticket table in a workbook.
+
+    Returns ``(worksheet, header_row, {column name: column index})`` for the row
+    that contains the most TICKET_COLUMNS, stopping at the first complete match.
+    """
+    best = None
+    for ws in wb.worksheets:
+        for row_idx, row in enumerate(ws.iter_rows(max_row=scan_rows, values_only=True), start=1):
+            positions = {}
+            for col_idx, value in enumerate(row):
+                name = str(value).strip() if value is not None else None
+                if name in TICKET_COLUMNS and name not in positions:
+                    positions[name] = col_idx
+            if best is None or len(positions) > len(best[2]):
+                best = (ws, row_idx, positions)
+            if len(positions) == len(TICKET_COLUMNS):
+                return best
+    if best is None or not best[2]:
+        raise ValueError(
+            "No worksheet has a ticket header (expected columns: " + ", ".join(TICKET_COLUMNS) + ")"
+        )
+    return best
+
+
+def _parse_datetime_value(value):
+    """Best-effort parse of one cell as a naive timestamp; NaT when it is not a date.
+
+    Timezone-aware values are converted to UTC and made naive. Plain numbers
+    are Excel serial dates (days since 1899-12-30): a date cell that lost its
+    number format.
+    """
+    if isinstance(value, bool):
+        return pd.NaT
+    if isinstance(value, (int, float, np.number)):
+        if not 0 < value < EXCEL_MAX_SERIAL:
+            return pd.NaT
+        return EXCEL_EPOCH + pd.Timedelta(days=float(value))
+    try:
+        stamp = pd.Timestamp(value)
+    except (TypeError, ValueError, OverflowError):
+        return pd.NaT
+    if stamp is not pd.NaT and stamp.tzinfo is not None:
+        stamp = stamp.tz_convert('UTC').tz_localize(None)
+    return stamp
+
+
+def parse_datetimes(values, fmt=DATETIME_FORMAT):
+    """Vectorized datetime parse with a known format.
+
+    Values that do not match ``fmt`` fall back to per-value inference (see
+    _parse_datetime_value), which never raises. Returns ``(parsed, coerced)``
+    where ``coerced`` counts non-empty values that still ended up as NaT.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values, 0
+    parsed = pd.to_datetime(values, format=fmt, errors='coerce')
+    failed = parsed.isna() & values.notna()
+    if failed.any():
+        fallback = []
+        for value in values[failed]:
+            stamp = _parse_datetime_value(value)
+            try:
+                # a value outside the column's unit range is unreadable too
+                fallback.append(np.datetime64(stamp, 'us').astype(parsed.dtype) if stamp is not pd.NaT else np.datetime64('NaT'))
+            except (OverflowError, ValueError):
+                fallback.append(np.datetime64('NaT'))
+        parsed.loc[failed] = np.array(fallback, dtype=parsed.dtype)
+    coerced = int((parsed.isna() & values.notna()).sum())
+    return parsed, coerced
+
+
+def to_categories(values):
+    """Convert a column to a categorical with sorted categories."""
+    values = pd.Series(values, dtype=object)
+    present = values.notna()
+    values[present] = values[present].astype(str)
+    categories = sorted(values[present].unique())
+    return values.astype(pd.CategoricalDtype(categories))
+
+
+def add_resolution_hours(df):
+    """Derive ``resolution_hours`` (float32, NaN for open tickets) from Created/Closed Time."""
+    if 'Created Time' in df.columns and 'Closed Time' in df.columns:
+        delta = df['Closed Time'] - df['Created Time']
+        df['resolution_hours'] = (delta / pd.Timedelta(hours=1)).astype('float32')
+    return df
+
+
+def _typed_chunk(columns):
+    chunk = pd.DataFrame(columns)
+    coerced = {}
+    for col in DATE_COLUMNS:
+        if col in chunk.columns:
+            chunk[col], coerced[col] = parse_datetimes(chunk[col])
+    chunk.attrs['coerced_dates'] = coerced
+    return add_resolution_hours(chunk)
+
+
+def iter_ticket_chunks(source, chunk_rows=INGEST_CHUNK_ROWS):
+    """Stream the ticket sheet as typed DataFrame chunks of at most ``chunk_rows`` rows.
+
+    Only the ticket sheet is read, and only its TICKET_COLUMNS. The workbook is
+    opened read-only, so drawings, charts and pivot parts are never loaded and
+    rows are parsed from the worksheet XML as they are consumed.
+    """
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    wb = openpyxl.load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws, header_row, positions = find_ticket_header(wb)
+        names = [name for name in TICKET_COLUMNS if name in positions]
+        indices = [positions[name] for name in names]
+        columns = {name: [] for name in names}
+        pending = 0
+        emitted = False
+        for row in ws.iter_rows(min_row=header_row + 1, max_col=max(indices) + 1, values_only=True):
+            values = [row[i] if i < len(row) else None for i in indices]
+            if all(v is None for v in values):
+                continue
+            for name, value in zip(names, values):
+                columns[name].append(value)
+            pending += 1
+            if pending >= chunk_rows:
+                yield _typed_chunk(columns)
+                columns = {name: [] for name in names}
+                pending = 0
+                emitted = True
+        # always emit at least one (possibly empty) chunk so callers get the columns
+        if pending or not emitted:
+            yield _typed_chunk(columns)
+    finally:
+        wb.close()
+
+
+def finalize_tickets(df):
+    """Categorize CATEGORY_COLUMNS and sort by Created Time (NaT last).
+
+    Applied to a complete frame, e.g. after concatenating chunks or workbooks,
+    so all rows share one set of category codes.
+    """
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = to_categories(df[col])
+
+    if 'Created Time' in df.columns:
+        df = df.sort_values('Created Time', kind='stable', na_position='last', ignore_index=True)
+    return df
+
+
+def read_tickets(source, chunk_rows=INGEST_CHUNK_ROWS):
+    """Parse a ticket export into a typed DataFrame.
+
+    Rows are sorted by Created Time (NaT last) so date windows can be sliced
+    with a binary search. ``df.attrs['coerced_dates']`` maps each date column
+    to the number of non-empty values that could not be parsed and were set
+    to NaT.
+    """
+    chunks = list(iter_ticket_chunks(source, chunk_rows))
+    df = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+    coerced = {}
+    for chunk in chunks:
+        for col, count in chunk.attrs['coerced_dates'].items():
+            coerced[col] = coerced.get(col, 0) + count
+    df.attrs['coerced_dates'] = coerced
+
+    # categories are decided on the whole sheet so every chunk shares the same codes
+    return finalize_tickets(df)
+
+
+def sidecar_path(fingerprint, cache_dir=SIDECAR_DIR):
+    """Location of the Parquet sidecar for a source fingerprint."""
+    key = hashlib.sha256(f"v{SIDECAR_VERSION}:{fingerprint}".encode()).hexdigest()
+    return os.path.join(cache_dir, f"{key}.parquet")
+
+
+def read_parquet_frame(path):
+    """Memory-mapped Parquet read that restores ``df.attrs``."""
+    table = pq.read_table(path, memory_map=True)
+    df = table.to_pandas()
+    attrs = (table.schema.metadata or {}).get(SIDECAR_ATTRS_KEY)
+    if attrs:
+        df.attrs.update(json.loads(attrs))
+    return df
+
+
+def write_parquet_frame(df, path):
+    """Atomically write ``df`` (and its ``attrs``) to a Parquet file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if df.attrs:
+        metadata = dict(table.schema.metadata or {})
+        metadata[SIDECAR_ATTRS_KEY] = json.dumps(df.attrs).encode()
+        table = table.replace_schema_metadata(metadata)
+    # write to a temp file first so a concurrent reader never sees a partial file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def touch_cache_file(path):
+    """Mark a cache file as used, for prune_cache's LRU order."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def prune_cache(cache_dir, pattern, keep=None):
+    """Delete all but the ``keep`` most recently used files matching ``pattern`` in ``cache_dir``.
+
+    ``keep`` defaults to SIDECAR_MAX_FILES. Files are ranked by modification
+    time, which touch_cache_file refreshes on every use. Open files may be
+    deleted: readers keep their handle or mapping.
+    """
+    keep = SIDECAR_MAX_FILES if keep is None else keep
+    used = []
+    for path in glob.glob(os.path.join(cache_dir, pattern)):
+        try:
+            used.append((os.stat(path).st_mtime_ns, path))
+        except OSError:
+            pass  # removed by a concurrent prune
+    for _, path in sorted(used, reverse=True)[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def load_tickets(source, fingerprint, cache_dir=SIDECAR_DIR):
+    """Return the typed ticket frame, served from its Parquet sidecar when present."""
+    path = sidecar_path(fingerprint, cache_dir)
+    if os.path.exists(path):
+        try:
+            df = read_parquet_frame(path)
+            touch_cache_file(path)
+            return df
+        except (OSError, pa.ArrowException):
+            pass  # unreadable sidecar: rebuild it from the workbook below
+
+    df = read_tickets(source)
+    try:
+        write_parquet_frame(df, path)
+        prune_cache(cache_dir, '*.parquet')
+    except (OSError, pa.ArrowException):
+        pass  # the sidecar is an optimization; read-only disks or odd dtypes just skip it
+    return df
@@ -0,0 +1,405 @@
+"""Filtering and aggregation helpers for the ticket dashboard.
+
+The loader stores the low-cardinality ticket fields as categoricals, so these
+helpers translate labels to category codes once and then work on the small
+integer code arrays instead of comparing strings row by row.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+
+def _codes(series):
+    return series.cat.codes.to_numpy()
+
+
+def label_codes(series, labels):
+    """Category codes for ``labels``; labels that are not categories are ignored."""
+    categories = series.cat.categories
+    codes = categories.get_indexer(pd.Index(list(labels), dtype=categories.dtype))
+    return codes[codes >= 0]
+
+
+def matching_codes(series, pattern):
+    """Codes of the categories containing ``pattern`` (case-insensitive)."""
+    categories = series.cat.categories
+    return np.flatnonzero(categories.str.contains(pattern, case=False, regex=False))
+
+
+def category_counts(series):
+    """``value_counts()`` for a categorical via a bincount over its codes.
+
+    Only categories that occur are returned, most frequent first.
+    """
+    codes = _codes(series)
+    counts = np.bincount(codes[codes >= 0], minlength=len(series.cat.categories))
+    result = pd.Series(counts, index=series.cat.categories, name='count')
+    return result[result > 0].sort_values(ascending=False, kind='stable')
+
+
+def created_bounds(created):
+    """First and last non-NaT timestamp of a Created Time column sorted ascending (NaT last).
+
+    Returns ``(None, None)`` when no row has a creation time.
+    """
+    times = created.to_numpy()
+    valid = times.searchsorted(np.datetime64('NaT'))
+    if valid == 0:
+        return None, None
+    return pd.Timestamp(times[0]), pd.Timestamp(times[valid - 1])
+
+
+def date_slice(created, start_date, end_date):
+    """Positional slice of the rows created on ``start_date`` .. ``end_date``, both days inclusive.
+
+    ``created`` must be sorted ascending with NaT last (as loaded by
+    ticket_io), so the window is two binary searches.
+    """
+    times = created.to_numpy()
+    start = pd.Timestamp(start_date).normalize().to_datetime64()
+    # the end bound is exclusive at midnight after end_date so the whole last day is included
+    stop = (pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)).to_datetime64()
+    return slice(int(times.searchsorted(start)), int(times.searchsorted(stop)))
+
+
+def select_rows(rows=slice(None), mask=None):
+    """Row positions of a filtered view, without touching any row data.
+
+    ``rows`` is the date window (a positional slice) and ``mask`` the optional
+    filter mask over all of ``df``. With no mask the window itself is returned,
+    otherwise an int64 array of the selected positions (ascending).
+    """
+    if mask is None:
+        return rows
+    start = rows.start or 0
+    return np.flatnonzero(mask[rows]) + start
+
+
+def take_rows(df, rows=slice(None)):
+    """Materialize the view of ``df`` at ``rows`` (as returned by ``select_rows``) in one step.
+
+    For a slice the result is ``df`` itself or a positional slice of it, so no
+    row data is copied; positions are gathered with a single ``take``. The
+    result shares data with the cached frame and must not be modified in place.
+    """
+    if isinstance(rows, slice):
+        return df if rows == slice(None) else df.iloc[rows]
+    return df.take(rows)
+
+
+def sort_order(df, column='Created Time', ascending=False):
+    """Row positions of ``df`` ordered by ``column``, missing values last.
+
+    Views produced by ``take_rows`` are already in ascending Created Time
+    order (NaT last), so sorting on it only reverses the non-missing head;
+    other columns need one stable argsort.
+    """
+    if column == 'Created Time':
+        valid = int(df[column].to_numpy().searchsorted(np.datetime64('NaT')))
+        head = np.arange(valid) if ascending else np.arange(valid - 1, -1, -1)
+        return np.concatenate([head, np.arange(valid, len(df))])
+    ranked = df[column].reset_index(drop=True).sort_values(ascending=ascending, kind='stable', na_position='last')
+    return ranked.index.to_numpy()
+
+
+def page_rows(df, order, page, page_size, rows=slice(None)):
+    """Rows of 1-based ``page`` in ``order``, indexed by their rank in the sorted view.
+
+    ``order`` ranks the view of ``df`` at ``rows`` (see ``select_rows``), so
+    only the page itself is gathered from ``df``.
+    """
+    start = (page - 1) * page_size
+    stop = min(start + page_size, len(order))
+    positions = order[start:stop]
+    positions = positions + (rows.start or 0) if isinstance(rows, slice) else rows[positions]
+    page_df = df.take(positions)
+    page_df.index = pd.RangeIndex(start, stop)
+    return page_df
+
+
+def filter_options(df, column):
+    """Values offered by a sidebar multiselect for ``column``."""
+    if column not in df.columns:
+        return []
+    return list(df[column].cat.categories)
+
+
+# Columns driven by the sidebar multiselects
+FILTER_COLUMNS = ('Priority', 'TicketType', 'Resolution Status')
+
+
+class FilterIndex:
+    """Per-value row bitmaps for the sidebar filter columns.
+
+    Built once per dataset: every category of every filter column gets a
+    bit-packed row bitmap (one bit per row). A filter combination is resolved
+    by OR-ing the selected values of a column and AND-ing across columns, so
+    the work is proportional to n_rows / 8 bytes per selected value instead of
+    a full ``isin`` scan per filter.
+    """
+
+    def __init__(self, df, columns=FILTER_COLUMNS):
+        self.n_rows = len(df)
+        self.bitmaps = {}
+        for column in columns:
+            if column not in df.columns:
+                continue
+            codes = _codes(df[column])
+            self.bitmaps[column] = {
+                label: np.packbits(codes == code)
+                for code, label in enumerate(df[column].cat.categories)
+            }
+
+    def column_bitmap(self, column, labels):
+        """Packed bitmap of the rows whose ``column`` is one of ``labels``."""
+        column_bitmaps = self.bitmaps.get(column, {})
+        bitmaps = [column_bitmaps[label] for label in labels if label in column_bitmaps]
+        if not bitmaps:
+            return np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        return np.bitwise_or.reduce(bitmaps)
+
+    def select(self, filters):
+        """Boolean row mask for ``{column: selected labels}``.
+
+        Columns with an empty selection do not filter. Returns None when no
+        filter is active so callers can skip masking altogether.
+        """
+        active = [self.column_bitmap(column, labels) for column, labels in filters.items() if labels]
+        if not active:
+            return None
+        packed = np.bitwise_and.reduce(active)
+        return np.unpackbits(packed, count=self.n_rows).astype(bool)
+
+
+def filter_key(priorities, ticket_types, sla_statuses, start_date=None, end_date=None):
+    """Normalized, hashable form of the sidebar filter state.
+
+    Selection order does not matter and the date window is reduced to whole
+    days, so equivalent sidebar states map to the same key.
+    """
+    if start_date is not None and end_date is None:
+        end_date = start_date
+    return (
+        tuple(sorted(priorities)),
+        tuple(sorted(ticket_types)),
+        tuple(sorted(sla_statuses)),
+        None if start_date is None else pd.Timestamp(start_date).date(),
+        None if end_date is None else pd.Timestamp(end_date).date(),
+    )
+
+
+def filter_rows(df, index, key):
+    """Row positions (see ``select_rows``) of ``df``'s view for a ``filter_key`` tuple, using its FilterIndex."""
+    priorities, ticket_types, sla_statuses, start_date, end_date = key
+    mask = index.select({
+        'Priority': priorities,
+        'TicketType': ticket_types,
+        'Resolution Status': sla_statuses,
+    })
+    rows = slice(None)
+    if start_date is not None and 'Created Time' in df.columns:
+        rows = date_slice(df['Created Time'], start_date, end_date)
+    return select_rows(rows, mask)
+
+
+def apply_filters(df, index, key):
+    """Filtered view of ``df`` for a ``filter_key`` tuple, using its FilterIndex."""
+    return take_rows(df, filter_rows(df, index, key))
+
+
+Kpis = namedtuple('Kpis', 'total_tickets within_sla sla_percentage avg_resolution_hours p4_tickets')
+
+
+def compute_kpis(df):
+    """All headline metrics of a filtered view in one pass over its typed columns.
+
+    Category predicates (``'Within'`` in the SLA status, priority ``P4``) are
+    evaluated once per category into lookup tables, so each metric is a single
+    vectorized reduction over an integer code or float array; no strings
+    are scanned and no intermediate frames are built.
+    """
+    total = len(df)
+
+    within_sla = 0
+    if 'Resolution Status' in df.columns and total:
+        status = df['Resolution Status']
+        lut = np.zeros(len(status.cat.categories) + 1, dtype=np.int64)
+        lut[matching_codes(status, 'Within')] = 1
+        # code -1 (missing) indexes the trailing zero of the table
+        within_sla = int(lut[_codes(status)].sum())
+
+    p4_tickets = 0
+    if 'Priority' in df.columns and total:
+        p4_codes = label_codes(df['Priority'], ['P4'])
+        if len(p4_codes):
+            p4_tickets = int(np.count_nonzero(_codes(df['Priority']) == p4_codes[0]))
+
+    avg_resolution_hours = None
+    if 'resolution_hours' in df.columns and total:
+        hours = df['resolution_hours'].to_numpy()
+        resolved = np.count_nonzero(~np.isnan(hours))
+        if resolved:
+            avg_resolution_hours = round(float(np.nansum(hours, dtype=np.float64) / resolved), 2)
+
+    return Kpis(
+        total_tickets=total,
+        within_sla=within_sla,
+        sla_percentage=(within_sla / total * 100) if total > 0 else 0,
+        avg_resolution_hours=avg_resolution_hours,
+        p4_tickets=p4_tickets,
+    )
+
+
+def summarize(df):
+    """Headline KPIs and chart aggregates for a filtered view."""
+    summary = {'kpis': compute_kpis(df)}
+
+    summary['priority_counts'] = None
+    if 'Priority' in df.columns and not df.empty:
+        summary['priority_counts'] = category_counts(df['Priority'])
+
+    summary['type_counts'] = None
+    if 'TicketType' in df.columns and not df.empty:
+        summary['type_counts'] = category_counts(df['TicketType'])
+
+    summary['trend'] = None
+    if 'Created Time' in df.columns and not df.empty:
+        # per-day counts on a datetime index, as TicketCube.summarize and bucket_trend use
+        trend = df.groupby(df['Created Time'].dt.normalize()).size()
+        summary['trend'] = trend if not trend.empty else None
+    return summary
+
+
+# Dimensions of the pre-aggregated cube, in axis order; the last axis is the
+# created day.
+CUBE_DIMENSIONS = ('Priority', 'TicketType', 'Resolution Status')
+
+
+class TicketCube:
+    """Ticket counts and resolution totals per Priority x TicketType x Resolution Status x created day.
+
+    Built once per dataset with a few ``bincount`` passes. Slot 0 of every
+    category axis holds rows with a missing value. The day axis only has the
+    days on which tickets were created (so an outlier date adds one slot, not
+    the span up to it), plus a last slot for rows without a Created Time.
+    ``summarize`` answers a ``filter_key`` by summing the selected cells, so its
+    cost depends on the number of categories and days, not on the number of
+    tickets.
+    """
+
+    def __init__(self, df, dimensions=CUBE_DIMENSIONS):
+        self.dimensions = dimensions
+        self.categories = {}
+        axes = []
+        for column in dimensions:
+            if column in df.columns:
+                self.categories[column] = df[column].cat.categories
+                axes.append(_codes(df[column]).astype(np.int64) + 1)
+            else:
+                self.categories[column] = pd.Index([], dtype=object)
+                axes.append(np.zeros(len(df), dtype=np.int64))
+
+        # distinct creation days, ascending; day holds each row's slot on that axis
+        self.has_created = 'Created Time' in df.columns
+        self.days = np.array([], dtype='datetime64[D]')
+        day = np.zeros(len(df), dtype=np.int64)
+        if self.has_created:
+            created = df['Created Time'].to_numpy()
+            valid = ~np.isnat(created)
+            self.days, inverse = np.unique(created[valid].astype('datetime64[D]'), return_inverse=True)
+            day = np.full(len(df), len(self.days), dtype=np.int64)
+            day[valid] = inverse.ravel()
+        n_days = len(self.days)
+
+        shape = tuple(len(self.categories[column]) + 1 for column in dimensions) + (n_days + 1,)
+        flat = np.ravel_multi_index(axes + [day], shape)
+        size = int(np.prod(shape))
+        self.counts = np.bincount(flat, minlength=size).reshape(shape)
+
+        self.resolved = np.zeros(shape)
+        self.hours = np.zeros(shape)
+        if 'resolution_hours' in df.columns:
+            hours = df['resolution_hours'].to_numpy(dtype=np.float64)
+            done = ~np.isnan(hours)
+            self.resolved = np.bincount(flat, weights=done, minlength=size).reshape(shape)
+            self.hours = np.bincount(flat, weights=np.where(done, hours, 0.0), minlength=size).reshape(shape)
+        self.has_resolution = 'resolution_hours' in df.columns
+
+    def _axis_index(self, column, labels):
+        if not labels:
+            return np.arange(len(self.categories[column]) + 1)
+        categories = self.categories[column]
+        codes = categories.get_indexer(pd.Index(list(labels), dtype=categories.dtype))
+        return codes[codes >= 0] + 1
+
+    def _day_index(self, start_date, end_date):
+        # like apply_filters, a dataset without Created Time ignores the window
+        if start_date is None or not self.has_created:
+            return np.arange(len(self.days) + 1)
+        lo = self.days.searchsorted(np.datetime64(pd.Timestamp(start_date).date(), 'D'), side='left')
+        hi = self.days.searchsorted(np.datetime64(pd.Timestamp(end_date).date(), 'D'), side='right')
+        return np.arange(lo, hi)
+
+    def _labelled(self, column, totals):
+        result = pd.Series(totals[1:], index=self.categories[column], name='count')
+        return result[result > 0].sort_values(ascending=False, kind='stable')
+
+    def summarize(self, key):
+        """KPIs and chart aggregates for a ``filter_key``, in the shape ``summarize`` returns."""
+        priorities, ticket_types, sla_statuses, start_date, end_date = key
+        cells = np.ix_(
+            self._axis_index('Priority', priorities),
+            self._axis_index('TicketType', ticket_types),
+            self._axis_index('Resolution Status', sla_statuses),
+            self._day_index(start_date, end_date),
+        )
+        counts = self.counts[cells]
+        total = int(counts.sum())
+
+        status_totals = np.zeros(len(self.categories['Resolution Status']) + 1, dtype=np.int64)
+        status_totals[cells[2].ravel()] = counts.sum(axis=(0, 1, 3))
+        within_codes = np.flatnonzero(
+            self.categories['Resolution Status'].str.contains('Within', case=False, regex=False)
+        ) if len(self.categories['Resolution Status']) else np.arange(0)
+        within_sla = int(status_totals[within_codes + 1].sum())
+
+        priority_totals = np.zeros(len(self.categories['Priority']) + 1, dtype=np.int64)
+        priority_totals[cells[0].ravel()] = counts.sum(axis=(1, 2, 3))
+        p4_code = self.categories['Priority'].get_indexer(['P4'])[0] if len(self.categories['Priority']) else -1
+        p4_tickets = int(priority_totals[p4_code + 1]) if p4_code >= 0 else 0
+
+        avg_resolution_hours = None
+        resolved = self.resolved[cells].sum()
+        if self.has_resolution and total and resolved:
+            avg_resolution_hours = round(float(self.hours[cells].sum() / resolved), 2)
+
+        summary = {'kpis': Kpis(
+            total_tickets=total,
+            within_sla=within_sla,
+            sla_percentage=(within_sla / total * 100) if total > 0 else 0,
+            avg_resolution_hours=avg_resolution_hours,
+            p4_tickets=p4_tickets,
+        )}
+
+        summary['priority_counts'] = None
+        if len(self.categories['Priority']) and total:
+            summary['priority_counts'] = self._labelled('Priority', priority_totals)
+
+        summary['type_counts'] = None
+        if len(self.categories['TicketType']) and total:
+            type_totals = np.zeros(len(self.categories['TicketType']) + 1, dtype=np.int64)
+            type_totals[cells[1].ravel()] = counts.sum(axis=(0, 2, 3))
+            summary['type_counts'] = self._labelled('TicketType', type_totals)
+
+        summary['trend'] = None
+        if len(self.days) and total:
+            days = cells[3].ravel()
+            per_day = counts.sum(axis=(0, 1, 2))
+            real = days < len(self.days)
+            trend = pd.Series(
+                per_day[real],
+                index=pd.DatetimeIndex(self.days[days[real]].astype('datetime64[us]'), name='Created Time'),
+            )
+            summary['trend'] = trend[trend > 0]
+        return summary
@@ -0,0 +1,41 @@
+"""Synthetic ticket sets for the benchmarks and the tests."""
+import numpy as np
+import pandas as pd
+
+from ticket_io import add_resolution_hours, finalize_tickets
+
+PRIORITIES = ['P1', 'P2', 'P3', 'P4']
+TICKET_TYPES = ['Bug (Tech)', 'Configuration & Master Update (Non-Tech)', 'Data Correction (Tech)', 'Not a Task (Info Only)']
+SLA_STATUSES = ['SLA Violated', 'Within SLA']
+STATUSES = ['Closed', 'Open', 'Resolved']
+SAMPLE_START = np.datetime64('2025-01-01T00:00:00', 'us')
+
+
+def synthetic_tickets(n, seed=0, days=365, missing=0.01, undated=0.0):
+    """``n`` typed tickets created over ``days`` days from SAMPLE_START, as load_tickets returns them.
+
+    About 15% of the tickets are still open, ``missing`` of every category
+    value is blank and ``undated`` of the tickets have no Created Time.
+    """
+    rng = np.random.default_rng(seed)
+    created = SAMPLE_START + rng.integers(0, days * 86_400, n).astype('timedelta64[s]')
+    closed = created + rng.integers(0, 7 * 86_400, n).astype('timedelta64[s]')
+    closed[rng.random(n) < 0.15] = np.datetime64('NaT')
+    created[rng.random(n) < undated] = np.datetime64('NaT')
+
+    def pick(values, missing=missing):
+        column = np.array(values, dtype=object)[rng.integers(0, len(values), n)]
+        column[rng.random(n) < missing] = None
+        return column
+
+    df = pd.DataFrame({
+        'Ticket Id': np.arange(n, dtype=np.int64),
+        'Created Time': created,
+        'Closed Time': closed,
+        'Priority': pick(PRIORITIES),
+        'Resolution Status': pick(SLA_STATUSES),
+        'Status': pick(STATUSES),
+        'Subject': pick([f"Ticket subject {i}" for i in range(50)], 0),
+        'TicketType': pick(TICKET_TYPES),
+    })
+    return finalize_tickets(add_resolution_hours(df))
@@ -0,0 +1,285 @@
+"""Persistent ticket history built from the weekly exports.
+
+The history is a set of Parquet partitions plus a small index of
+``Ticket Id -> (row hash, Created Time, Closed Time, export time)``. Adding a week only
+parses that export, looks its tickets up in the index and appends the inserted
+or changed rows as a new partition, so ingestion cost follows the size of the
+new week rather than the size of the archive.
+
+Partitions are laid out by Created Time month
+(``created_month=2025-11/part-00003.parquet``), so reading a date window only
+opens the months that overlap it.
+"""
+import glob
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+# Writers lock the store through a lock file as well; fcntl is POSIX-only,
+# elsewhere only writers within one process are serialized.
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from ticket_io import TICKET_COLUMNS, finalize_tickets, read_parquet_frame, read_tickets, write_parquet_frame
+
+# The history lives next to the app, like the Parquet sidecars.
+HISTORY_DIR = os.environ.get('TICKET_HISTORY_DIR', '.ticket_history')
+HISTORY_INDEX = 'index.parquet'
+HISTORY_LOCK = '.lock'
+PARTITION_PATTERN = os.path.join('created_month=*', 'part-*.parquet')
+# Month partition for tickets without a Created Time; only read unpruned.
+UNDATED_MONTH = 'none'
+
+
+def _parse_workbook(source):
+    # worker entry point: sources are (name, bytes) pairs or paths, both picklable
+    if isinstance(source, tuple):
+        source = BytesIO(source[1])
+    return read_tickets(source)
+
+
+def parse_workbooks(sources, max_workers=None):
+    """Parse several exports in parallel, returning one typed frame per source in order."""
+    sources = list(sources)
+    if len(sources) <= 1:
+        return [_parse_workbook(source) for source in sources]
+    workers = min(len(sources), max_workers or os.cpu_count() or 1)
+    # spawn, not fork: the caller is the multi-threaded Streamlit server
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return list(pool.map(_parse_workbook, sources))
+
+
+def dedupe_tickets(df, recency=None):
+    """Keep one row per Ticket Id: the one from the newest export.
+
+    ``recency`` orders the rows' exports (e.g. their export_time, one value per
+    row); missing values (NaT) count as oldest, and without it all rows count
+    as one export. On equal recency the later Closed Time wins (open counting
+    as oldest), then the later row. Rows without a Ticket Id are kept.
+    """
+    if 'Ticket Id' not in df.columns:
+        return df
+    # NaT is the smallest int64, so open tickets and undated exports sort first
+    keys = [np.zeros(len(df), dtype=np.int64) if recency is None else np.asarray(recency).view(np.int64)]
+    if 'Closed Time' in df.columns:
+        keys.insert(0, df['Closed Time'].to_numpy('datetime64[us]').view(np.int64))
+    df = df.iloc[np.lexsort(keys)]
+    ids = df['Ticket Id']
+    return df[~ids.duplicated(keep='last') | ids.isna()]
+
+
+def merge_tickets(frames, recency=None):
+    """Combine ticket frames into one de-duplicated, finalized frame.
+
+    ``recency`` orders the frames' exports (see dedupe_tickets) and defaults to
+    each frame's export_time; frames given oldest first win no ties.
+    """
+    if recency is None:
+        recency = [export_time(frame) if frame is not None else np.datetime64('NaT', 'us') for frame in frames]
+    recency = [value for value, frame in zip(recency, frames) if frame is not None]
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return None
+    # categories differ between exports, so merge on plain values and re-categorize
+    df = pd.concat(
+        [frame.astype({col: object for col in frame.select_dtypes('category').columns}) for frame in frames],
+        ignore_index=True,
+    )
+    return finalize_tickets(dedupe_tickets(df, np.repeat(recency, [len(frame) for frame in frames])))
+
+
+def export_time(df):
+    """When an export was taken, as far as its rows tell: its latest Created or Closed Time (NaT if none)."""
+    times = np.concatenate([
+        df[col].to_numpy('datetime64[us]') for col in ('Created Time', 'Closed Time') if col in df.columns
+    ] + [np.array([], dtype='datetime64[us]')])
+    times = times[~np.isnat(times)]
+    return times.max() if len(times) else np.datetime64('NaT', 'us')
+
+
+def row_hashes(df):
+    """64-bit content hash per row over the ticket columns, independent of dtypes and category codes."""
+    columns = [col for col in TICKET_COLUMNS if col in df.columns]
+    values = df[columns].astype(object).where(df[columns].notna(), None)
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+def _index_path(store_dir):
+    return os.path.join(store_dir, HISTORY_INDEX)
+
+
+def _partition_month(path):
+    return os.path.basename(os.path.dirname(path)).split('=', 1)[1]
+
+
+def _partition_sequence(path):
+    return int(os.path.basename(path)[len('part-'):-len('.parquet')])
+
+
+def _partitions(store_dir, start_date=None, end_date=None):
+    """Partition files in write order, pruned to the months overlapping the window if given."""
+    paths = glob.glob(os.path.join(store_dir, PARTITION_PATTERN))
+    if start_date is not None:
+        first = pd.Timestamp(start_date).strftime('%Y-%m')
+        last = pd.Timestamp(end_date if end_date is not None else start_date).strftime('%Y-%m')
+        paths = [
+            path for path in paths
+            if _partition_month(path) != UNDATED_MONTH and first <= _partition_month(path) <= last
+        ]
+    return sorted(paths, key=lambda path: (_partition_sequence(path), path))
+
+
+def has_history(store_dir=HISTORY_DIR):
+    return os.path.exists(_index_path(store_dir))
+
+
+def history_fingerprint(store_dir=HISTORY_DIR):
+    """Cheap identity of the stored history; the index is rewritten on every upsert."""
+    stat = os.stat(_index_path(store_dir))
+    return f"history:{os.path.abspath(store_dir)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def read_history(store_dir=HISTORY_DIR, start_date=None, end_date=None):
+    """The stored ticket history, or None when there is nothing to read.
+
+    With ``start_date``/``end_date`` only the month partitions overlapping that
+    window are read; the result can still hold tickets outside the window
+    (from the same months), which the dashboard's own date filter removes.
+    """
+    paths = _partitions(store_dir, start_date, end_date)
+    # a stored row only ever replaces older ones, so the latest write wins
+    return merge_tickets([read_parquet_frame(path) for path in paths], [_partition_sequence(path) for path in paths])
+
+
+def history_bounds(store_dir=HISTORY_DIR):
+    """First and last Created Time in the history, read from the index alone."""
+    created = _read_index(store_dir)['Created Time']
+    if created.isna().all():
+        return None, None
+    return created.min(), created.max()
+
+
+def _read_index(store_dir):
+    if not has_history(store_dir):
+        return pd.DataFrame({
+            'Ticket Id': pd.Series(dtype=object),
+            'row_hash': pd.Series(dtype=np.uint64),
+            'Created Time': pd.Series(dtype='datetime64[us]'),
+            'Closed Time': pd.Series(dtype='datetime64[us]'),
+            'export_time': pd.Series(dtype='datetime64[us]'),
+        })
+    index = read_parquet_frame(_index_path(store_dir))
+    if 'export_time' not in index.columns:
+        # written before export times were recorded: treat as the oldest export
+        index['export_time'] = pd.Series(pd.NaT, index=index.index, dtype='datetime64[us]')
+    return index
+
+
+# Serializes writers between the app's session threads; the lock file covers
+# other processes.
+_write_lock = threading.Lock()
+
+
+@contextmanager
+def _locked(store_dir):
+    """Exclusive write access to the store: the sequence number, partitions and index are read-modify-write."""
+    os.makedirs(store_dir, exist_ok=True)
+    with _write_lock, open(os.path.join(store_dir, HISTORY_LOCK), 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def upsert_tickets(df, store_dir=HISTORY_DIR):
+    """Add one export's tickets to the history.
+
+    Tickets are looked up by Ticket Id in the history index. New tickets are
+    inserted. A stored ticket whose content changed is replaced when this
+    version is newer: from a later export (see export_time), so a reopened
+    ticket replaces its closed version, or, from an equally recent export, with
+    a Closed Time no earlier than the stored one (open counts as oldest).
+    Everything else is skipped, so re-ingesting an older export never rolls
+    tickets back. Returns ``(inserted, updated)`` counts.
+    """
+    with _locked(store_dir):
+        return _upsert_tickets(df, store_dir)
+
+
+def _upsert_tickets(df, store_dir):
+    taken = export_time(df)
+    df = dedupe_tickets(df)
+    ids = df['Ticket Id'] if 'Ticket Id' in df.columns else pd.Series(np.nan, index=df.index)
+    hashes = row_hashes(df)
+    closed = (df['Closed Time'] if 'Closed Time' in df.columns else pd.Series(pd.NaT, index=df.index)).to_numpy('datetime64[us]')
+    created = df['Created Time'] if 'Created Time' in df.columns else pd.Series(pd.NaT, index=df.index, dtype='datetime64[us]')
+
+    index = _read_index(store_dir)
+    positions = pd.Index(index['Ticket Id']).get_indexer(ids)
+    known = (positions >= 0) & ids.notna().to_numpy()
+    stored_hash = np.zeros(len(df), dtype=np.uint64)
+    stored_hash[known] = index['row_hash'].to_numpy()[positions[known]]
+    stored_closed = np.full(len(df), np.datetime64('NaT'), dtype=closed.dtype)
+    stored_closed[known] = index['Closed Time'].to_numpy()[positions[known]]
+    stored_taken = np.full(len(df), np.datetime64('NaT'), dtype='datetime64[us]')
+    stored_taken[known] = index['export_time'].to_numpy('datetime64[us]')[positions[known]]
+    # same ordering as dedupe_tickets, NaT counting as oldest: the newer export
+    # wins, then the later Closed Time, then the later ingest
+    taken_newer = ~np.isnat(taken) & (np.isnat(stored_taken) | (taken > stored_taken))
+    taken_equal = (np.isnat(taken) & np.isnat(stored_taken)) | (taken == stored_taken)
+    closed_not_older = np.isnat(stored_closed) | (~np.isnat(closed) & (closed >= stored_closed))
+    updated = known & (stored_hash != hashes) & (taken_newer | (taken_equal & closed_not_older))
+    inserted = ~known
+    changed = inserted | updated
+    if not changed.any():
+        return 0, 0
+
+    existing = _partitions(store_dir)
+    sequence = _partition_sequence(existing[-1]) + 1 if existing else 0
+    months = created.dt.strftime('%Y-%m').fillna(UNDATED_MONTH)[changed]
+    for month, rows in df[changed].groupby(months.to_numpy(), sort=True):
+        path = os.path.join(store_dir, f"created_month={month}", f"part-{sequence:05d}.parquet")
+        write_parquet_frame(rows, path)
+
+    entries = pd.DataFrame({
+        'Ticket Id': ids[changed].to_numpy(),
+        'row_hash': hashes[changed],
+        'Created Time': created[changed].to_numpy('datetime64[us]'),
+        'Closed Time': closed[changed],
+        'export_time': np.full(int(changed.sum()), taken),
+    })
+    entries = entries[entries['Ticket Id'].notna()]
+    index = pd.concat([index[~index['Ticket Id'].isin(entries['Ticket Id'])], entries], ignore_index=True)
+    write_parquet_frame(index, _index_path(store_dir))
+    return int(inserted.sum()), int(updated.sum())
+
+
+def ingest_workbooks(sources, store_dir=HISTORY_DIR, max_workers=None):
+    """Parse weekly exports in parallel and upsert them into the history.
+
+    ``sources`` are paths or ``(name, bytes)`` pairs in any order; they are
+    upserted oldest export first (by export_time). Returns the total
+    ``(inserted, updated)`` counts.
+    """
+    frames = parse_workbooks(sources, max_workers)
+    taken = np.array([export_time(frame) for frame in frames], dtype='datetime64[us]')
+    inserted = updated = 0
+    # parse in parallel, but write under one lock so concurrent ingests cannot interleave
+    with _locked(store_dir):
+        # stable, so equal exports keep their given order; exports without any timestamp go last
+        for position in np.argsort(taken, kind='stable'):
+            added, changed = _upsert_tickets(frames[position], store_dir)
+            inserted += added
+            updated += changed
+    return inserted, updated